@@ -1,13 +1,30 @@
-from flask import Flask, render_template, request, redirect, flash, url_for, session, send_from_directory, abort
-from flask_mysql_connector import MySQL
+from flask import Flask, render_template, request, redirect, flash, url_for, session, abort, jsonify, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.wsgi import wrap_file
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 import os
 
+from game_builds import ENCODINGS, GameBuildIndex
+import migrations
+from db import Database
+from page_cache import PageCache
+from passwords import HasherBusy, PasswordHasher
+from ttl_cache import TTLCache
+from user_search import UsernameIndex
+
 app = Flask(__name__)
 app.secret_key = "1234"  # Needed for flash messages
 
+# How long browsers may reuse a game file with a hashed name, i.e. the shared
+# asset pack shared-<hash>.apk, without asking again. Every other file, level
+# bundles included, is revalidated on each visit, which its ETag makes a
+# cheap 304 when the level hasn't been rebuilt.
+app.config['GAME_ASSET_MAX_AGE'] = int(os.environ.get('GAME_ASSET_MAX_AGE', 7 * 24 * 3600))
+# How often the build index checks static/game for rebuilt levels (0 = never)
+app.config['GAME_INDEX_REFRESH_SECONDS'] = int(os.environ.get('GAME_INDEX_REFRESH_SECONDS', 10))
+# How often cached level pages check their templates for edits (0 = never)
+app.config['PAGE_CACHE_REFRESH_SECONDS'] = int(os.environ.get('PAGE_CACHE_REFRESH_SECONDS', 10))
+
 # app.config['MYSQL_HOST'] = os.environ.get('MYSQL_HOST')
 # app.config['MYSQL_USER'] = os.environ.get('MYSQL_USER')
 # app.config['MYSQL_PASSWORD'] = os.environ.get('MYSQL_PASSWORD')
@@ -17,13 +34,63 @@ app.config['MYSQL_HOST'] = 'localhost'
 app.config['MYSQL_USER'] = 'root'
 app.config['MYSQL_PASSWORD'] = ''
 app.config['MYSQL_DATABASE'] = 'db'
-mysql = MySQL(app)
+# Connections kept open per worker (one per thread, see --threads in the Procfile),
+# how long a request waits for one, and the age after which a connection is replaced
+app.config['MYSQL_POOL_SIZE'] = int(os.environ.get('MYSQL_POOL_SIZE', 8))
+app.config['MYSQL_POOL_TIMEOUT'] = float(os.environ.get('MYSQL_POOL_TIMEOUT', 5))
+app.config['MYSQL_POOL_RECYCLE'] = int(os.environ.get('MYSQL_POOL_RECYCLE', 1800))
+# Ping a connection before reuse only if it sat idle this many seconds
+app.config['MYSQL_POOL_PRE_PING'] = True
+app.config['MYSQL_POOL_PING_AFTER'] = int(os.environ.get('MYSQL_POOL_PING_AFTER', 30))
+# Open the whole pool in the background when a worker serves its first request
+app.config['MYSQL_POOL_WARM'] = True
+db = Database(app)
+migrations.init_app(app, db)  # flask --app app db apply|rollback|status|check
+
+# Logged-in users are looked up on every request; cache them per worker.
+# update_icon invalidates its own entry, the TTL bounds staleness elsewhere.
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 4096))
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 60))
+user_cache = TTLCache(maxsize=app.config['USER_CACHE_SIZE'], ttl=app.config['USER_CACHE_TTL'])
+
+# Werkzeug hash method for new passwords; older hashes are upgraded on login.
+# Pick one with: flask --app app passwords benchmark --target-ms 250
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+# Hashes computed at once per worker, and how long a login waits for a slot.
+# Logins hold at most 2 * PASSWORD_HASH_WORKERS of the Procfile's 8 threads;
+# a waiting login holds one more, so by default a full queue answers 503 at once.
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', 0))
+hasher = PasswordHasher(app)
+
+# Most users returned by one page of friend search results
+app.config['USER_SEARCH_LIMIT'] = 20
+# Most usernames accepted by one /add_friends or /remove_friends request
+app.config['FRIEND_BATCH_LIMIT'] = 200
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 # --- Page Routes ---
+# Level, minigame and cutscene wrapper pages, rendered once per auth state
+pages = PageCache(app, ('GCSE', 'Alevel', 'Minigames'),
+                  refresh_interval=app.config['PAGE_CACHE_REFRESH_SECONDS'])
+
+def cached_page(name):
+    auth = session.get('profile_icon') if 'username' in session else None
+    page = pages.get(name, auth)
+    if page is None:
+        abort(404)
+    body, etag = page
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    # The page depends on the session cookie, so only the browser may cache it
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response.make_conditional(request)
+
 @app.route('/')  #Home page
 def home():
     return render_template('home.html')
@@ -39,10 +106,7 @@ def gcse():
 
 @app.route('/levels/gcse/level<level>')
 def show_gcse_level(level):
-    try:
-        return render_template(f'/GCSE/gcse{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'GCSE/gcse{level}.html')
 
 # A-Level Level Routes
 @app.route('/levels/alevel') # A-Level level selection page
@@ -51,10 +115,7 @@ def alevel():
 
 @app.route('/levels/alevel/level<level>')
 def show_alevel_level(level):
-    try:
-        return render_template(f'/Alevel/alevel{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'Alevel/alevel{level}.html')
 
 # Minigame Routes
 @app.route('/levels/minigames') # A-Level level selection page
@@ -63,100 +124,87 @@ def minigames():
 
 @app.route('/levels/minigames/minigame<level>')
 def show_minigame_level(level):
-    try:
-        return render_template(f'/Minigames/minigame{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'Minigames/minigame{level}.html')
 
 @app.route('/levels/gcse/gcseminigame<level>')
 def show_gcse_minigame_level(level):
-    try:
-        return render_template(f'/GCSE/GCSE_Minigames/gcse_minigame{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'GCSE/GCSE_Minigames/gcse_minigame{level}.html')
 
 @app.route('/levels/alevel/alevelminigame<level>')
 def show_alevel_minigame_level(level):
-    try:
-        return render_template(f'/Alevel/Alevel_Minigames/alevel_minigame{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'Alevel/Alevel_Minigames/alevel_minigame{level}.html')
 
 # Cutscene Routes
 @app.route('/levels/gcse/gcsecutscene<level>')
 def show_gcse_cutscene(level):
-    try:
-        return render_template(f'/GCSE/GCSE_Cutscenes/gcse_cutscene{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'GCSE/GCSE_Cutscenes/gcse_cutscene{level}.html')
 
 @app.route('/levels/alevel/alevelcutscene<level>')
 def show_alevel_cutscene(level):
-    try:
-        return render_template(f'/Alevel/Alevel_Cutscenes/alevel_cutscene{level}.html')
-    except:
-        abort(404)
+    return cached_page(f'Alevel/Alevel_Cutscenes/alevel_cutscene{level}.html')
 
 # --- Dynamic Game Routes ---
-# GCSE
-@app.route('/play gcse/<level>/')
-def play_gcse_level(level):
-    # Path to the build/web folder for the requested level
-    build_dir = os.path.join(app.static_folder, 'game', 'GCSE', level, 'build', 'web')
-    index_path = os.path.join(build_dir, 'index.html')
-    if not os.path.exists(index_path):
-        abort(404)
-    return send_from_directory(build_dir, 'index.html')
-
-@app.route('/play gcse/<level>/<path:filename>')
-def play_gcse_asset(level, filename):
-    build_dir = os.path.join(app.static_folder, 'game', 'GCSE', level, 'build', 'web')
-    return send_from_directory(build_dir, filename)
-
-#Alevel
-@app.route('/play alevel/<level>/')
-def play_alevel_level(level):
-    # Path to the build/web folder for the requested level
-    build_dir = os.path.join(app.static_folder, 'game', 'Alevel', level, 'build', 'web')
-    index_path = os.path.join(build_dir, 'index.html')
-    if not os.path.exists(index_path):
-        abort(404)
-    return send_from_directory(build_dir, 'index.html')
-
-@app.route('/play alevel/<level>/<path:filename>')
-def play_alevel_asset(level, filename):
-    build_dir = os.path.join(app.static_folder, 'game', 'Alevel', level, 'build', 'web')
-    return send_from_directory(build_dir, filename)
-
-# Minigames
-@app.route('/play minigame/<level>/')
-def play_minigame(level):
-    # Path to the build/web folder for the requested level
-    build_dir = os.path.join(app.static_folder, 'game', 'Minigame', level, 'build', 'web')
-    index_path = os.path.join(build_dir, 'index.html')
-    if not os.path.exists(index_path):
-        abort(404)
-    return send_from_directory(build_dir, 'index.html')
-
-@app.route('/play minigame/<level>/<path:filename>')
-def play_minigame_asset(level, filename):
-    build_dir = os.path.join(app.static_folder, 'game', 'Minigame', level, 'build', 'web')
-    return send_from_directory(build_dir, filename)
-
-#Cutscenes
-@app.route('/play cutscene/<level>/')
-def play_cutscene(level):
-    # Path to the build/web folder for the requested level
-    build_dir = os.path.join(app.static_folder, 'game', 'Cutscenes', level, 'build', 'web')
-    index_path = os.path.join(build_dir, 'index.html')
-    if not os.path.exists(index_path):
+# url prefix, folder under static/game, level endpoint, asset endpoint
+GAME_ROUTES = (
+    ('gcse', 'GCSE', 'play_gcse_level', 'play_gcse_asset'),
+    ('alevel', 'Alevel', 'play_alevel_level', 'play_alevel_asset'),
+    ('minigame', 'Minigame', 'play_minigame', 'play_minigame_asset'),
+    ('cutscene', 'Cutscenes', 'play_cutscene', 'play_cutscene_asset'),
+    # Asset pack shared by the level bundles, /play shared/pack/shared-<hash>.apk
+    ('shared', 'shared', 'play_shared', 'play_shared_asset'),
+)
+
+game_builds = GameBuildIndex(
+    os.path.join(app.static_folder, 'game'),
+    refresh_interval=app.config['GAME_INDEX_REFRESH_SECONDS'],
+)
+
+def game_file_response(game_file):
+    if game_file.data is not None:
+        response = app.response_class(game_file.data, mimetype=game_file.mimetype)
+    else:
+        try:
+            body = open(game_file.path, 'rb')
+        except OSError:
+            abort(404)
+        response = app.response_class(
+            wrap_file(request.environ, body),
+            mimetype=game_file.mimetype,
+            direct_passthrough=True,
+        )
+        response.content_length = game_file.size
+    response.last_modified = game_file.mtime
+    response.set_etag(game_file.etag)
+    # Handles Range/If-Range (206, 416), If-None-Match and If-Modified-Since (304)
+    return response.make_conditional(request.environ, accept_ranges=True, complete_length=game_file.size)
+
+def play_game(tier, level, filename):
+    build = game_builds.get(tier, level)
+    game_file = build.files.get(filename) if build else None
+    if game_file is None:
         abort(404)
-    return send_from_directory(build_dir, 'index.html')
 
-@app.route('/play cutscene/<level>/<path:filename>')
-def play_cutscene_asset(level, filename):
-    build_dir = os.path.join(app.static_folder, 'game', 'Cutscenes', level, 'build', 'web')
-    return send_from_directory(build_dir, filename)
+    encoding = next((name for name, _ in ENCODINGS
+                     if name in game_file.variants and request.accept_encodings[name]), None)
+    response = game_file_response(game_file.variants[encoding] if encoding else game_file)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+    if not game_file.pinned_by(filename):
+        # The same URL serves the next build, so browsers must ask each time
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['GAME_ASSET_MAX_AGE']
+        response.cache_control.immutable = True
+    return response
+
+for prefix, tier, level_endpoint, asset_endpoint in GAME_ROUTES:
+    app.add_url_rule(f'/play {prefix}/<level>/', level_endpoint, play_game,
+                     defaults={'tier': tier, 'filename': 'index.html'})
+    app.add_url_rule(f'/play {prefix}/<level>/<path:filename>', asset_endpoint, play_game,
+                     defaults={'tier': tier})
 
 # --- Authentication Routes ---
 @app.route('/login', methods=['GET', 'POST'])
@@ -164,15 +212,39 @@ def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
-        user_obj = User.get(username)
-        login_user(user_obj)
-        cursor = mysql.connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        user = cursor.fetchone()
-
-        if user and 'password_hash' in user and check_password_hash(user['password_hash'], password):
+        # One round trip: the same row gives the hash and the User to log in
+        with db.cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "SELECT id, username, password_hash, profile_icon FROM users WHERE username = %s",
+                (username,)
+            )
+            user = cursor.fetchone()
+
+        try:
+            valid = bool(user and user['password_hash']) and hasher.verify(user['password_hash'], password)
+        except HasherBusy:
+            flash("Lots of people are logging in right now. Please try again in a moment.", "error")
+            return render_template('login.html'), 503
+
+        if valid:
+            if hasher.needs_rehash(user['password_hash']):
+                try:
+                    new_hash = hasher.hash(password)
+                except HasherBusy:
+                    # Upgraded on a later login instead
+                    new_hash = None
+                if new_hash:
+                    with db.cursor() as cursor:
+                        cursor.execute(
+                            "UPDATE users SET password_hash = %s WHERE id = %s",
+                            (new_hash, user['id'])
+                        )
+                    db.commit()
+            user_obj = User.from_row(user)
+            user_cache.set(str(user_obj.id), user_obj)
+            login_user(user_obj)
             session['username'] = username
-            session['profile_icon'] = user.get('profile_icon') or 'default.svg'
+            session['profile_icon'] = user_obj.profile_icon
             return redirect(url_for('home'))
         flash("Invalid username or password.", "error")
 
@@ -189,18 +261,23 @@ def signup():
             flash("Passwords do not match.", "error")
             return redirect(url_for('signup'))
 
-        cursor = mysql.connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        if cursor.fetchone():
-            flash("Username already taken. Please choose another.", "error")
-            return redirect(url_for('signup'))
-
-        hashed_password = generate_password_hash(password)
-        cursor.execute(
-            "INSERT INTO users (username, password_hash) VALUES (%s, %s)",
-            (username, hashed_password)
-        )
-        mysql.connection.commit()
+        with db.cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id FROM users WHERE username = %s", (username,))
+            if cursor.fetchone():
+                flash("Username already taken. Please choose another.", "error")
+                return redirect(url_for('signup'))
+
+            try:
+                hashed_password = hasher.hash(password)
+            except HasherBusy:
+                flash("Lots of people are signing up right now. Please try again in a moment.", "error")
+                return render_template('signup.html'), 503
+            cursor.execute(
+                "INSERT INTO users (username, password_hash) VALUES (%s, %s)",
+                (username, hashed_password)
+            )
+        db.commit()
+        username_index.add(username)
         flash("Account created successfully! You can now log in.", "success")
         return redirect(url_for('login'))
 
@@ -213,22 +290,22 @@ def profile():
         return redirect(url_for('login'))
 
     username = session['username']
-    cursor = mysql.connection.cursor(dictionary=True)
-
-    # profile icon
-    cursor.execute("SELECT profile_icon FROM users WHERE username = %s", (username,))
-    user = cursor.fetchone()
-    icon = user['profile_icon'] if user else 'default.svg'
-
-    # their friends
-    cursor.execute("SELECT user2 AS friend_username FROM friends WHERE user1 = %s", (username,))
-    friends = cursor.fetchall()  # list of dicts: [{ 'friend_username': 'alice' }, ...]
-
+    with db.cursor(dictionary=True) as cursor:
+        # profile icon and their friends in one round trip, one row per friend
+        cursor.execute("""
+          SELECT u.profile_icon, f.user2 AS friend_username
+            FROM users u
+            LEFT JOIN friends f ON f.user1 = u.username
+           WHERE u.username = %s
+        """, (username,))
+        rows = cursor.fetchall()
+
+    icon = (rows[0]['profile_icon'] if rows else None) or 'default.svg'
     return render_template(
       'profile.html',
       username=username,
       user_profile_icon=icon,
-      friends_list=[f['friend_username'] for f in friends],
+      friends_list=[r['friend_username'] for r in rows if r['friend_username']],
       search_results=None,
       search_performed=False
     )
@@ -246,13 +323,13 @@ def add_friend():
         flash("You can’t add yourself.", "error")
         return redirect(url_for('profile'))
 
-    cursor = mysql.connection.cursor()
     try:
-        cursor.execute(
-          "INSERT INTO friends (user1, user2) VALUES (%s, %s)",
-          (user1, user2)
-        )
-        mysql.connection.commit()
+        with db.cursor() as cursor:
+            cursor.execute(
+              "INSERT INTO friends (user1, user2) VALUES (%s, %s)",
+              (user1, user2)
+            )
+        db.commit()
         flash(f"{user2} is now your friend!", "success")
     except Exception as e:
         # if it’s a duplicate key, they’re already friends
@@ -267,51 +344,145 @@ def remove_friend():
     user1 = session['username']
     user2 = request.form['friend_username']
 
-    cursor = mysql.connection.cursor()
-    cursor.execute(
-      "DELETE FROM friends WHERE user1 = %s AND user2 = %s",
-      (user1, user2)
-    )
-    mysql.connection.commit()
+    with db.cursor() as cursor:
+        cursor.execute(
+          "DELETE FROM friends WHERE user1 = %s AND user2 = %s",
+          (user1, user2)
+        )
+    db.commit()
     flash(f"You’ve removed {user2}.", "success")
     return redirect(url_for('profile'))
 
+# Batch friend routes: a JSON body {"usernames": [...]} or repeated
+# friend_username form fields, applied in a single statement
+def requested_usernames():
+    if request.is_json:
+        body = request.get_json(silent=True)
+        names = body.get('usernames', []) if isinstance(body, dict) else None
+        if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+            abort(400)
+    else:
+        names = request.form.getlist('friend_username')
+    names = [n.strip() for n in names if isinstance(n, str) and n.strip()]
+    names = list(dict.fromkeys(names))  # drop duplicates, keep order
+    if len(names) > app.config['FRIEND_BATCH_LIMIT']:
+        abort(413)
+    return names
+
+def batch_response(message, **counts):
+    if request.is_json:
+        return jsonify(**counts)
+    flash(message, "success")
+    return redirect(url_for('profile'))
+
+@app.route('/add_friends', methods=['POST'])
+def add_friends():
+    if 'username' not in session:
+        if request.is_json:
+            abort(401)
+        flash("Log in first to add friends.", "error")
+        return redirect(url_for('login'))
+
+    user1 = session['username']
+    names = [n for n in requested_usernames() if n != user1]
+    added = 0
+    if names:
+        placeholders = ', '.join(['%s'] * len(names))
+        with db.cursor() as cursor:
+            # Only existing users are added; rows that already exist are skipped
+            cursor.execute(
+              f"INSERT IGNORE INTO friends (user1, user2) "
+              f"SELECT %s, username FROM users WHERE username IN ({placeholders})",
+              (user1, *names)
+            )
+            added = cursor.rowcount
+        db.commit()
+    return batch_response(f"Added {added} new friend(s).", requested=len(names), added=added)
+
+@app.route('/remove_friends', methods=['POST'])
+def remove_friends():
+    if 'username' not in session:
+        if request.is_json:
+            abort(401)
+        return redirect(url_for('login'))
+
+    user1 = session['username']
+    names = requested_usernames()
+    removed = 0
+    if names:
+        placeholders = ', '.join(['%s'] * len(names))
+        with db.cursor() as cursor:
+            cursor.execute(
+              f"DELETE FROM friends WHERE user1 = %s AND user2 IN ({placeholders})",
+              (user1, *names)
+            )
+            removed = cursor.rowcount
+        db.commit()
+    return batch_response(f"Removed {removed} friend(s).", requested=len(names), removed=removed)
+
+def load_usernames(after_id):
+    # The index also loads from its own threads, outside any request
+    if not has_app_context():
+        with app.app_context():
+            return load_usernames(after_id)
+    with db.cursor() as cursor:
+        cursor.execute("SELECT id, username FROM users WHERE id > %s ORDER BY id", (after_id,))
+        return cursor.fetchall()
+
+username_index = UsernameIndex(load_usernames)
+
+@app.before_request
+def warm_username_index():
+    # Each worker loads the index in the background before its first search
+    username_index.warm()
+
+def find_users(me, query, after=None, limit=None):
+    """Friends of `me`, plus one page of other users whose name starts with `query`."""
+    with db.cursor(dictionary=True) as cursor:
+        cursor.execute(
+          "SELECT user2 AS friend_username FROM friends WHERE user1 = %s",
+          (me,)
+        )
+        friends_list = [r['friend_username'] for r in cursor.fetchall()]
+
+    # Anti-join against your friends (and yourself) while walking the index
+    limit = max(1, min(limit or app.config['USER_SEARCH_LIMIT'], app.config['USER_SEARCH_LIMIT']))
+    usernames, next_after = username_index.search(
+        query, exclude=set(friends_list) | {me}, after=after, limit=limit
+    )
+    return friends_list, usernames, next_after
+
 @app.route('/search_user')
 @login_required
 def search_user():
     me    = session['username']
     query = request.args.get('search_username', '').strip()
+    after = request.args.get('after')
 
-    cursor = mysql.connection.cursor(dictionary=True)
-
-    # 1) get your existing friends
-    cursor.execute(
-      "SELECT user2 AS friend_username FROM friends WHERE user1 = %s",
-      (me,)
-    )
-    friend_rows = cursor.fetchall()
-    friends_list = [r['friend_username'] for r in friend_rows]
-
-    # 2) now do the search
-    cursor.execute("""
-      SELECT username
-        FROM users
-       WHERE username LIKE %s
-         AND username != %s
-         AND username NOT IN (
-             SELECT user2 FROM friends WHERE user1 = %s
-         )
-    """, (f"%{query}%", me, me))
-    results = cursor.fetchall()
+    friends_list, usernames, next_after = find_users(me, query, after)
 
     return render_template(
       "profile.html",
       username=me,
       user_profile_icon=session.get('profile_icon'),
       friends_list=friends_list,
-      search_results=results,
-      search_performed=True
+      search_results=[{'username': name} for name in usernames],
+      search_performed=True,
+      search_query=query,
+      next_after=next_after
+    )
+
+@app.route('/search_user.json')
+@login_required
+def search_user_json():
+    # Type-ahead for the profile page's Find Friends box
+    _, usernames, next_after = find_users(
+        session['username'],
+        request.args.get('q', '').strip(),
+        request.args.get('after'),
+        request.args.get('limit', type=int),
     )
+    return jsonify(results=usernames, next=next_after)
 
 @app.route('/logout', methods=['POST'])
 def logout():
@@ -328,13 +499,15 @@ def update_icon():
     selected_icon = request.form.get('icon')
     if selected_icon:
         username = session['username']
-        cursor = mysql.connection.cursor()
-        cursor.execute(
-            "UPDATE users SET profile_icon = %s WHERE username = %s",
-            (selected_icon, username)
-        )
-        mysql.connection.commit()
+        with db.cursor() as cursor:
+            cursor.execute(
+                "UPDATE users SET profile_icon = %s WHERE username = %s",
+                (selected_icon, username)
+            )
+        db.commit()
         session['profile_icon'] = selected_icon
+        if current_user.is_authenticated:
+            user_cache.pop(str(current_user.id))
     return redirect(url_for('profile'))
 
 class User(UserMixin):
@@ -344,27 +517,36 @@ class User(UserMixin):
         self.profile_icon = profile_icon
 
     @staticmethod
-    def get(username):
-        cursor = mysql.connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
-        user = cursor.fetchone()
-        if not user:
-            return None
-        return User(id=user['id'], username=user['username'], profile_icon=user.get('profile_icon', 'default.svg'))
+    def from_row(row):
+        return User(id=row['id'], username=row['username'], profile_icon=row.get('profile_icon') or 'default.svg')
 
     @staticmethod
     def get_by_id(user_id):
-        cursor = mysql.connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
+        # Called by load_user on every authenticated request
+        user_obj = user_cache.get(str(user_id))
+        if user_obj is not None:
+            return user_obj
+        with db.cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, username, profile_icon FROM users WHERE id = %s", (user_id,))
+            user = cursor.fetchone()
         if not user:
             return None
-        return User(id=user['id'], username=user['username'], profile_icon=user.get('profile_icon', 'default.svg'))
+        user_obj = User.from_row(user)
+        user_cache.set(str(user_id), user_obj)
+        return user_obj
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.get_by_id(user_id)
 
+@app.route('/health/db')
+def db_health():
+    # Pool metrics for this worker: in_use, idle, waits, timeouts, ...
+    return jsonify(db.pool.stats())
+
+# Render every level page once now that all the routes it links to exist
+pages.warm()
+
 
 # Only needed for local dev, not when using gunicorn
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+"""Pooled MySQL connections with a per-request cursor lifecycle.
+
+Replaces flask_mysql_connector, which opened a connection per request and left
+every cursor open. Each worker process keeps up to MYSQL_POOL_SIZE connections.
+A request checks one out the first time it needs it and hands it back at
+teardown; cursors are always used through `db.cursor()` so they get closed.
+The first request a worker serves opens the rest of its pool in the
+background, so a burst of logins doesn't wait on connection setup.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from flask import g
+
+log = logging.getLogger(__name__)
+
+
+class PoolTimeout(mysql.connector.errors.PoolError):
+    """No connection became free within MYSQL_POOL_TIMEOUT seconds."""
+
+
+class _PooledConnection:
+    __slots__ = ('raw', 'created_at', 'released_at')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.released_at = self.created_at
+
+
+class ConnectionPool:
+    def __init__(self, connect, size=5, timeout=5.0, recycle=1800, pre_ping=True, ping_after=30):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.ping_after = ping_after  # only ping connections idle longer than this
+        self._idle = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self.metrics = {'created': 0, 'recycled': 0, 'ping_failures': 0, 'waits': 0, 'timeouts': 0}
+
+    def _new(self):
+        try:
+            conn = _PooledConnection(self.connect())
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        self.metrics['created'] += 1
+        return conn
+
+    def _usable(self, conn):
+        now = time.monotonic()
+        if self.recycle and now - conn.created_at > self.recycle:
+            self.metrics['recycled'] += 1
+            return False
+        # A connection handed back moments ago is still alive; only a long
+        # idle one may have been dropped by the server (wait_timeout)
+        if self.pre_ping and now - conn.released_at > self.ping_after:
+            try:
+                conn.raw.ping(reconnect=False)
+            except mysql.connector.Error:
+                self.metrics['ping_failures'] += 1
+                return False
+        return True
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            if not self._idle and self._open >= self.size:
+                self.metrics['waits'] += 1
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.metrics['timeouts'] += 1
+                    raise PoolTimeout(f"no MySQL connection free after {self.timeout}s")
+                self._cond.wait(remaining)
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                self._open += 1
+                conn = None
+
+        if conn is None:
+            return self._new()
+        if self._usable(conn):
+            return conn
+        self._close(conn.raw)
+        return self._new()
+
+    def release(self, conn, discard=False):
+        if not discard:
+            try:
+                # End the transaction so the next request doesn't see a stale snapshot.
+                # in_transaction comes from the last reply, so it costs no round trip.
+                if conn.raw.in_transaction:
+                    conn.raw.rollback()
+            except mysql.connector.Error:
+                discard = True
+        with self._cond:
+            if discard:
+                self._open -= 1
+            else:
+                conn.released_at = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+        if discard:
+            self._close(conn.raw)
+
+    def warm(self, count=None):
+        """Open connections ahead of time so a burst of requests doesn't wait on setup."""
+        count = min(count or self.size, self.size)
+        conns = []
+        try:
+            while self._open < count:
+                conns.append(self.acquire())
+        finally:
+            for conn in conns:
+                self.release(conn)
+
+    @staticmethod
+    def _close(raw):
+        try:
+            raw.close()
+        except mysql.connector.Error:
+            pass
+
+    def stats(self):
+        with self._cond:
+            idle = len(self._idle)
+            return dict(self.metrics, size=self.size, open=self._open, idle=idle, in_use=self._open - idle)
+
+
+class Database:
+    def __init__(self, app=None):
+        self.pool = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MYSQL_PORT', 3306)
+        app.config.setdefault('MYSQL_POOL_SIZE', 5)
+        app.config.setdefault('MYSQL_POOL_TIMEOUT', 5.0)
+        app.config.setdefault('MYSQL_POOL_RECYCLE', 1800)
+        app.config.setdefault('MYSQL_POOL_PRE_PING', True)
+        app.config.setdefault('MYSQL_POOL_PING_AFTER', 30)
+        app.config.setdefault('MYSQL_POOL_WARM', True)
+        config = app.config
+
+        def connect():
+            return mysql.connector.connect(
+                host=config['MYSQL_HOST'],
+                port=config['MYSQL_PORT'],
+                user=config['MYSQL_USER'],
+                password=config['MYSQL_PASSWORD'],
+                database=config['MYSQL_DATABASE'],
+            )
+
+        self.pool = ConnectionPool(
+            connect,
+            size=config['MYSQL_POOL_SIZE'],
+            timeout=config['MYSQL_POOL_TIMEOUT'],
+            recycle=config['MYSQL_POOL_RECYCLE'],
+            pre_ping=config['MYSQL_POOL_PRE_PING'],
+            ping_after=config['MYSQL_POOL_PING_AFTER'],
+        )
+        self._warmed_pid = None
+        if config['MYSQL_POOL_WARM']:
+            app.before_request(self._warm_worker)
+        app.teardown_appcontext(self._teardown)
+
+    def _warm_worker(self):
+        # gunicorn imports the app once and forks, so warm in each worker, not at import
+        if self._warmed_pid == os.getpid():
+            return
+        self._warmed_pid = os.getpid()
+        threading.Thread(target=self._warm, daemon=True).start()
+
+    def _warm(self):
+        try:
+            self.pool.warm()
+        except mysql.connector.Error:
+            log.exception("could not open the MySQL connection pool ahead of time")
+
+    @property
+    def connection(self):
+        """The connection checked out for the current request."""
+        if 'db_conn' not in g:
+            g.db_conn = self.pool.acquire()
+        return g.db_conn.raw
+
+    @contextmanager
+    def cursor(self, **kwargs):
+        # Buffered so closing never trips over unread rows
+        kwargs.setdefault('buffered', True)
+        cursor = self.connection.cursor(**kwargs)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def commit(self):
+        self.connection.commit()
+
+    def _teardown(self, exc):
+        conn = g.pop('db_conn', None)
+        if conn is not None:
+            self.pool.release(conn)
@@ -0,0 +1,168 @@
+"""In-memory index of the pygbag builds under static/game.
+
+The index is built once by scanning static/game/<Tier>/<Level>/build/web and
+holds everything the /play routes need: resolved paths, sizes, mtimes, ETags,
+the precompressed variants written by tools/precompress_builds.py, and the
+bytes of small files such as index.html. Looking a build up never touches the
+filesystem; a changed tree is picked up by a throttled stat-only check.
+"""
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+
+MANIFEST_NAME = 'manifest.json'
+# Variants written next to each file by tools/precompress_builds.py, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ENCODED_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+# Files up to this size are kept in memory and served without opening them
+INLINE_LIMIT = 64 * 1024
+# A content-addressed file name, e.g. shared-1a2b3c4d5e6f7a8b.apk: the hex is
+# the start of the file's sha256
+HASHED_NAME = re.compile(r'-([0-9a-f]{16})\.[^./]+$')
+
+
+class GameFile:
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'hashed', 'mimetype', 'data', 'variants')
+
+    def __init__(self, path, st, etag, mimetype, hashed=False):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        self.etag = etag
+        self.hashed = hashed  # etag is the manifest content hash
+        self.mimetype = mimetype
+        self.data = None
+        if st.st_size <= INLINE_LIMIT:
+            with open(path, 'rb') as f:
+                self.data = f.read()
+        self.variants = {}  # encoding -> GameFile
+
+    def pinned_by(self, name):
+        """True if name can only ever mean this content: it carries the start of the sha256.
+
+        A plain name like alevel1.apk gets new content on a rebuild.
+        """
+        match = HASHED_NAME.search(name)
+        return self.hashed and bool(match and self.etag.startswith(match.group(1)))
+
+
+class GameBuild:
+    def __init__(self, tier, level, directory, files):
+        self.tier = tier
+        self.level = level
+        self.directory = directory
+        self.files = files  # name relative to build/web -> GameFile
+
+    @property
+    def index_html(self):
+        index = self.files.get('index.html')
+        return index.data if index else None
+
+
+def _walk_files(directory, prefix=''):
+    for entry in os.scandir(directory):
+        name = prefix + entry.name
+        if entry.is_dir():
+            yield from _walk_files(entry.path, name + '/')
+        elif entry.is_file():
+            yield name, entry
+
+
+def _load_build(tier, level, directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        manifest = {}
+
+    entries = dict(_walk_files(directory))
+    files = {}
+    for name, entry in entries.items():
+        if name == MANIFEST_NAME or name.endswith(ENCODED_SUFFIXES):
+            continue
+        st = entry.stat()
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        info = manifest.get(name)
+        if info is None:
+            files[name] = GameFile(entry.path, st, f"{st.st_mtime_ns:x}-{st.st_size:x}", mimetype)
+            continue
+
+        game_file = GameFile(entry.path, st, info['sha256'], mimetype, hashed=True)
+        for encoding, suffix in ENCODINGS:
+            variant = entries.get(name + suffix)
+            if encoding in info['encodings'] and variant is not None:
+                game_file.variants[encoding] = GameFile(
+                    variant.path, variant.stat(), f"{info['sha256']}-{encoding}", mimetype, hashed=True
+                )
+        files[name] = game_file
+
+    # Nothing to serve, e.g. only a manifest or precompressed variants left behind
+    if not files:
+        return None
+    return GameBuild(tier, level, directory, files)
+
+
+class GameBuildIndex:
+    """Maps (tier, level) to the GameBuild served under /play <tier>/<level>/."""
+
+    def __init__(self, root, refresh_interval=10):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.builds = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def _build_dirs(self):
+        if not os.path.isdir(self.root):
+            return
+        for tier in sorted(os.listdir(self.root)):
+            tier_path = os.path.join(self.root, tier)
+            if not os.path.isdir(tier_path):
+                continue
+            for level in sorted(os.listdir(tier_path)):
+                directory = os.path.join(tier_path, level, 'build', 'web')
+                if os.path.isdir(directory):
+                    yield tier, level, directory
+
+    def signature(self):
+        """Cheap fingerprint of the tree: every file's path, size and mtime."""
+        return tuple(
+            (entry.path, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for _, _, directory in self._build_dirs()
+            for _, entry in sorted(_walk_files(directory))
+        )
+
+    def rebuild(self):
+        signature = self.signature()
+        builds = {}
+        for tier, level, directory in self._build_dirs():
+            build = _load_build(tier, level, directory)
+            if build is not None:
+                builds[tier, level] = build
+        self.builds = builds
+        self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _stale(self):
+        return bool(self.refresh_interval) and time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def refresh(self, force=True):
+        """Rebuild the index if anything under the root changed on disk."""
+        with self._lock:
+            # Threads that queued behind another refresh find the check done
+            if not force and not self._stale():
+                return
+            self._checked_at = time.monotonic()
+            if self.signature() != self._signature:
+                self.rebuild()
+
+    def get(self, tier, level):
+        if self._stale():
+            self.refresh(force=False)
+        return self.builds.get((tier, level))
@@ -3,6 +3,9 @@ import pygame
 import sys
 import os
 from js import window   
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 async def main():
     pygame.init()
@@ -15,48 +18,22 @@ async def main():
     window.parent.postMessage("loaded", "*")
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
+    assets = Assets(BASE_DIR)
     try:
-        control_room_bg = pygame.image.load(os.path.join(ASSET_DIR, 'controlroomdark.png'))
-        control_room_bg = pygame.transform.scale(control_room_bg, (WIDTH, HEIGHT))
-        
-
-        zoomed_background = pygame.image.load(os.path.join(ASSET_DIR, 'cr4.png'))
-        zoomed_background = pygame.transform.scale(zoomed_background, (WIDTH, HEIGHT))
-
-        resistor_100k_image = pygame.image.load(os.path.join(ASSET_DIR, '100kr.png'))
-        resistor_100k_image = pygame.transform.scale(resistor_100k_image, (80, 50))
-
-        resistor_1k_image = pygame.image.load(os.path.join(ASSET_DIR, '1kr.png'))
-        resistor_1k_image = pygame.transform.scale(resistor_1k_image, (76, 46))
-
-        resistor_47k = pygame.image.load(os.path.join(ASSET_DIR, '47kres.png'))
-        resistor_47k = pygame.transform.scale(resistor_47k, (80, 50))
-
-        resistor_1_5k_image = pygame.image.load(os.path.join(ASSET_DIR, '15kr.png'))
-        resistor_1_5k_image = pygame.transform.scale(resistor_1_5k_image, (78, 48))
-
-        resistor_100_image = pygame.image.load(os.path.join(ASSET_DIR, '100r.png'))
-        resistor_100_image = pygame.transform.scale(resistor_100_image, (80, 50))
-
-        led_off_image = pygame.image.load(os.path.join(ASSET_DIR, 'LEDOFF.png'))
-        led_off_image = pygame.transform.scale(led_off_image, (60, 70))
-
-        led_on_image = pygame.image.load(os.path.join(ASSET_DIR, 'LEDON.png'))
-        led_on_image = pygame.transform.scale(led_on_image, (60, 70))
-
-        battery_image = pygame.image.load(os.path.join(ASSET_DIR, 'source.png'))
-        battery_image = pygame.transform.scale(battery_image, (100, 100))
-
-        switchoff_image = pygame.image.load(os.path.join(ASSET_DIR, 'switchoff.png'))
-        switchoff_image = pygame.transform.scale(switchoff_image, (80, 40))
-
-        switchon_image = pygame.image.load(os.path.join(ASSET_DIR, 'switchon.png'))
-        switchon_image = pygame.transform.scale(switchon_image, (80, 40))
-
-        legend = pygame.image.load(os.path.join(ASSET_DIR, 'legendm.png'))
-        legend = pygame.transform.scale(legend, (390, 290))
+        control_room_bg = assets.image('control_room_bg')
+        zoomed_background = assets.image('zoomed_background')
+        resistor_100k_image = assets.image('resistor_100k')
+        resistor_1k_image = assets.image('resistor_1k')
+        resistor_47k = assets.image('resistor_47k')
+        resistor_1_5k_image = assets.image('resistor_1_5k')
+        resistor_100_image = assets.image('resistor_100')
+        led_off_image = assets.image('led_off')
+        led_on_image = assets.image('led_on')
+        battery_image = assets.image('battery')
+        switchoff_image = assets.image('switch_off')
+        switchon_image = assets.image('switch_on')
+        legend = assets.image('legend')
 
     except pygame.error as e:
         print(f"Error loading images: {e}")
@@ -96,16 +73,18 @@ async def main():
     mouse_offset = (0, 0)
     running = True
 
+    # Message panel for the overview, built once rather than every frame
+    msg_rect = pygame.Rect(90, 130, 620, 60)
+    # Use SRCALPHA for proper transparency in WASM builds
+    overlay = pygame.Surface((msg_rect.width, msg_rect.height), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 180))
+
     while running:
         screen.fill(WHITE)
 
         # --- Draw ---
         if current_state == STATE_OVERVIEW:
             screen.blit(control_room_bg, (0, 0))
-            msg_rect = pygame.Rect(90, 130, 620, 60)
-            # Use SRCALPHA for proper transparency in WASM builds
-            overlay = pygame.Surface((msg_rect.width, msg_rect.height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))
             screen.blit(overlay, msg_rect.topleft)
 
             init_msg = font.render("The control board is not working! Click to fix it", True, WHITE)
@@ -3,6 +3,9 @@ import pygame
 import sys
 import os
 from js import window
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 pygame.init()
 
@@ -31,41 +34,27 @@ pygame.display.set_caption("Level 10 - Magnetic Puzzle")
 font = pygame.font.SysFont(None, 28)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ASSET_DIR = os.path.join(BASE_DIR, "assets")
+assets = Assets(BASE_DIR)
 try:
-    rocket_img          = pygame.image.load(os.path.join(ASSET_DIR, 'rocketbroken.png'))
-    rocket_img          = pygame.transform.scale(rocket_img, (220, 250))
-    space_bg            = pygame.image.load(os.path.join(ASSET_DIR, 'deepspace.png'))
-    space_bg            = pygame.transform.scale(space_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-    rocket_solenoid_img = pygame.image.load(os.path.join(ASSET_DIR, 'rocketsolenoid.png'))
-    rocket_solenoid_img = pygame.transform.scale(rocket_solenoid_img, (800, 600))
-    legend              = pygame.image.load(os.path.join(ASSET_DIR, 'legendb.png'))
-    legend              = pygame.transform.scale(legend, (300, 240))
-
-    img_low      = pygame.image.load(os.path.join(ASSET_DIR, "tilelow.png"))
-    img_stable   = pygame.image.load(os.path.join(ASSET_DIR, "tilestable.png"))
-    img_strong   = pygame.image.load(os.path.join(ASSET_DIR, "tilestrong.png"))
-    img_unstable = pygame.image.load(os.path.join(ASSET_DIR, "tileunstable.png"))
-    img_reverse  = pygame.image.load(os.path.join(ASSET_DIR, "tilerev.png"))
-    img_wall     = pygame.image.load(os.path.join(ASSET_DIR, "tilewall.png"))
-    weapon       = pygame.image.load(os.path.join(ASSET_DIR, "weapon.png"))
-    source       = pygame.image.load(os.path.join(ASSET_DIR, "source.png"))
-    info_img     = pygame.image.load(os.path.join(ASSET_DIR, "info.png"))
-    info_img     = pygame.transform.scale(info_img, (650, 500))
+    rocket_img          = assets.image('rocket')
+    space_bg            = assets.image('space_bg')
+    rocket_solenoid_img = assets.image('rocket_solenoid')
+    legend              = assets.image('legend')
+
+    img_low      = assets.image('tile_low')
+    img_stable   = assets.image('tile_stable')
+    img_strong   = assets.image('tile_strong')
+    img_unstable = assets.image('tile_unstable')
+    img_reverse  = assets.image('tile_reverse')
+    img_wall     = assets.image('tile_wall')
+    weapon       = assets.image('weapon')
+    source       = assets.image('source')
+    info_img     = assets.image('info')
 except Exception as e:
     print(f"Error loading images: {e}")
     pygame.quit()
     sys.exit()
 
-img_low = pygame.transform.scale(img_low, (TILE_SIZE, TILE_SIZE))
-img_stable = pygame.transform.scale(img_stable, (TILE_SIZE, TILE_SIZE))
-img_strong = pygame.transform.scale(img_strong, (TILE_SIZE, TILE_SIZE))
-img_unstable = pygame.transform.scale(img_unstable, (TILE_SIZE, TILE_SIZE))
-img_reverse = pygame.transform.scale(img_reverse, (TILE_SIZE, TILE_SIZE))
-img_wall = pygame.transform.scale(img_wall, (TILE_SIZE, TILE_SIZE)) 
-weapon = pygame.transform.scale(weapon, (80,60))
-source = pygame.transform.scale(source,(62, 62))
-
 tile_images = {
     'low': img_low,
     'stable': img_stable,
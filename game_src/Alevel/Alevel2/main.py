@@ -1,7 +1,20 @@
+# /// script
+# dependencies = [
+#     "numpy",
+# ]
+# ///
 import pygame
 import random
+import math
 import asyncio
+import os
+import sys
+from collections import deque
+import numpy as np
 from js import window
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from gradient_cache import draw_vertical_gradient
 
 # === Constants ===
 WIDTH, HEIGHT = 800, 640
@@ -18,18 +31,6 @@ PARTICLE_RADIUS = 5
 k_B = 1.38e-23  # Boltzmann constant
 
 
-# === Functions ===
-def draw_vertical_gradient(surface, top_color, bottom_color):
-    """Draws a vertical gradient from top_color to bottom_color on the given surface."""
-    height = surface.get_height()
-    for y in range(height):
-        # Interpolate the color
-        ratio = y / height
-        r = int(top_color[0] * (1 - ratio) + bottom_color[0] * ratio)
-        g = int(top_color[1] * (1 - ratio) + bottom_color[1] * ratio)
-        b = int(top_color[2] * (1 - ratio) + bottom_color[2] * ratio)
-        pygame.draw.line(surface, (r, g, b), (0, y), (surface.get_width(), y))
-
 # === Base Classes ===
 class BaseEntity:
     def move(self):
@@ -55,159 +56,377 @@ class BaseUI:
         raise NotImplementedError
 
 
-# === Particle ===
-class Particle(BaseEntity):
-    def __init__(self, x, y, vx, vy, bounds: pygame.Rect):
-        self.x = x
-        self.y = y
-        self.vx = vx
-        self.vy = vy
-        self.base_vx = vx  # Store base velocity for speed calculation
-        self.base_vy = vy  # Store base velocity for speed calculation
+# === Particles ===
+# Particle colour runs from blue (still) to red (MAX_COLOUR_SPEED and above),
+# quantised into buckets so each colour's dot is only drawn once.
+MAX_COLOUR_SPEED = 3.0
+# Frames of wall impulses averaged for the measured pressure
+PRESSURE_WINDOW = 240
+# Passes over the contacts per frame when particles touch several others at once
+COLLISION_ROUNDS = 4
+COLOUR_BUCKETS = 64
+BUCKET_COLOURS = [
+    (int(255 * i / (COLOUR_BUCKETS - 1)), 0, int(255 * (1 - i / (COLOUR_BUCKETS - 1))))
+    for i in range(COLOUR_BUCKETS)
+]
+
+_dot_sprites = {}
+_bucket_palettes = {}
+
+
+def dot_sprite(colour):
+    """Pre-rendered particle dot for an RGB or RGBA colour, built on first use."""
+    sprite = _dot_sprites.get(colour)
+    if sprite is None:
+        sprite = pygame.Surface((PARTICLE_RADIUS * 2, PARTICLE_RADIUS * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, colour, (PARTICLE_RADIUS, PARTICLE_RADIUS), PARTICLE_RADIUS)
+        _dot_sprites[colour] = sprite
+    return sprite
+
+
+def bucket_sprites(alpha=None):
+    """Dot sprites for every colour bucket, in bucket order."""
+    palette = _bucket_palettes.get(alpha)
+    if palette is None:
+        palette = [dot_sprite(c if alpha is None else c + (alpha,)) for c in BUCKET_COLOURS]
+        _bucket_palettes[alpha] = palette
+    return palette
+
+
+class ParticleSystem(BaseEntity):
+    """Every molecule in a simulator, stored as arrays instead of one object each.
+
+    Positions and velocities are numpy arrays, so moving, bouncing and colouring
+    thousands of particles is a handful of array operations per frame. With
+    `collisions` on, particles also bounce elastically off each other.
+    """
+
+    def __init__(self, count, bounds: pygame.Rect, min_speed, max_speed, collisions=False):
         self.bounds = bounds
+        self.collisions = collisions
+        self.collision_count = 0  # particle-particle collisions in the last frame
+        self.wall_impulses = deque(maxlen=PRESSURE_WINDOW)  # (measured, predicted) wall momentum per frame
+        # Drawn with the random module so random.seed() makes a run repeatable
+        r = PARTICLE_RADIUS
+        self.x = np.array([random.randint(bounds.left + r, bounds.right - r) for _ in range(count)], dtype=float)
+        self.y = np.array([random.randint(bounds.top + r, bounds.bottom - r) for _ in range(count)], dtype=float)
+        self.vx = np.array([random.choice([-1, 1]) * random.uniform(min_speed, max_speed) for _ in range(count)])
+        self.vy = np.array([random.choice([-1, 1]) * random.uniform(min_speed, max_speed) for _ in range(count)])
+
+    def __len__(self):
+        return len(self.x)
+
+    def speeds(self):
+        return np.hypot(self.vx, self.vy)
+
+    def set_speed(self, speed):
+        """Rescale every velocity to the same magnitude, keeping its direction."""
+        current = self.speeds()
+        stopped = current == 0
+        if stopped.any():
+            n = int(stopped.sum())
+            self.vx[stopped] = [random.choice([-1, 1]) * speed for _ in range(n)]
+            self.vy[stopped] = [random.choice([-1, 1]) * speed for _ in range(n)]
+            current[stopped] = speed * 2 ** 0.5
+        scale = speed / current
+        self.vx *= scale
+        self.vy *= scale
 
     def move(self):
         self.x += self.vx
         self.y += self.vy
 
-        # Bounce on horizontal bounds
-        if self.x - PARTICLE_RADIUS < self.bounds.left:
-            self.x = self.bounds.left + PARTICLE_RADIUS
-            self.vx *= -1
-        elif self.x + PARTICLE_RADIUS > self.bounds.right:
-            self.x = self.bounds.right - PARTICLE_RADIUS
-            self.vx *= -1
-
-        # Bounce on vertical bounds
-        if self.y - PARTICLE_RADIUS < self.bounds.top:
-            self.y = self.bounds.top + PARTICLE_RADIUS
-            self.vy *= -1
-        elif self.y + PARTICLE_RADIUS > self.bounds.bottom:
-            self.y = self.bounds.bottom - PARTICLE_RADIUS
-            self.vy *= -1
-
-    def speed_to_colour(self, speed, max_speed=3.0):
-        speed = max(0.0, min(speed, max_speed))
-        ratio = speed / max_speed
-        red = int(255 * ratio)
-        blue = int(255 * (1 - ratio))
-        return (red, 0, blue)
-    
-    def draw(self, screen, color=None):
-        speed = (self.vx ** 2 + self.vy ** 2) ** 0.5
-        draw_color = color if color else self.speed_to_colour(speed)
-        pygame.draw.circle(screen, draw_color, (int(self.x), int(self.y)), PARTICLE_RADIUS)
+        # Bounce off the bounds, adding up the momentum handed to the walls (m = 1)
+        b = self.bounds
+        r = PARTICLE_RADIUS
+        impulse = 0.0
+        for pos, vel, low, high in ((self.x, self.vx, b.left + r, b.right - r),
+                                    (self.y, self.vy, b.top + r, b.bottom - r)):
+            # Only particles heading out bounce; a shrinking box can also
+            # catch ones that are already on their way back in
+            below = pos < low
+            pos[below] = low
+            out = np.minimum(vel[below], 0.0)
+            impulse -= 2 * out.sum()
+            vel[below] -= 2 * out
+            above = pos > high
+            pos[above] = high
+            out = np.maximum(vel[above], 0.0)
+            impulse += 2 * out.sum()
+            vel[above] -= 2 * out
+        if len(self):
+            self.wall_impulses.append((impulse, self._ideal_wall_impulse()))
+
+        if self.collisions:
+            self.collision_count = self.collide()
+
+    def _candidate_pairs(self):
+        """Index pairs close enough to touch, from a uniform grid of particle-sized cells.
+
+        Particles are sorted by cell, so the particles in any cell are one slice
+        of the sorted order. Each particle is paired with the later particles of
+        its own cell and everything in four of its neighbours, which visits each
+        neighbouring cell pair once. The cost grows with n log n for the sort and
+        linearly with the number of close pairs.
+        """
+        n = len(self)
+        size = 2 * PARTICLE_RADIUS
+        b = self.bounds
+        # One empty column either side so a neighbour never wraps onto the next row
+        cols = b.width // size + 3
+        cx = ((self.x - b.left) // size).astype(np.intp) + 1
+        cy = ((self.y - b.top) // size).astype(np.intp) + 1
+        np.clip(cx, 1, cols - 2, out=cx)
+        key = cy * cols + cx
+
+        order = np.argsort(key, kind='stable')
+        sorted_key = key[order]
+        index = np.arange(n)
+        firsts, seconds = [], []
+        for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+            target = sorted_key + dy * cols + dx
+            start = np.searchsorted(sorted_key, target, 'left')
+            end = np.searchsorted(sorted_key, target, 'right')
+            if dx == 0 and dy == 0:
+                start = np.maximum(start, index + 1)
+            counts = np.maximum(end - start, 0)
+            total = int(counts.sum())
+            if total:
+                # Expand each [start, end) range into its own run of indices
+                firsts.append(np.repeat(index, counts))
+                seconds.append(np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(total))
+        if not firsts:
+            return None, None
+        return order[np.concatenate(firsts)], order[np.concatenate(seconds)]
+
+    def collide(self):
+        """Resolve equal-mass elastic collisions, returning how many happened."""
+        i, j = self._candidate_pairs()
+        if i is None:
+            return 0
+        dx = self.x[j] - self.x[i]
+        dy = self.y[j] - self.y[i]
+        dist2 = dx * dx + dy * dy
+        touching = (dist2 < (2 * PARTICLE_RADIUS) ** 2) & (dist2 > 0)
+        i, j, dx, dy = i[touching], j[touching], dx[touching], dy[touching]
+        dist = np.sqrt(dist2[touching])
+
+        # A particle touching several others is resolved against the closest
+        # first. Each round handles pairs that share no particle, so every
+        # impulse is an exact two-body collision and energy is conserved.
+        closest = np.argsort(dist, kind='stable')
+        i, j, dx, dy, dist = i[closest], j[closest], dx[closest], dy[closest], dist[closest]
+        count = 0
+        for _ in range(COLLISION_ROUNDS):
+            if not len(i):
+                break
+            ends = np.concatenate((i, j))
+            _, first = np.unique(ends, return_index=True)
+            first_seen = np.zeros(len(ends), bool)
+            first_seen[first] = True
+            free = first_seen[:len(i)] & first_seen[len(i):]
+            count += self._resolve(i[free], j[free], dx[free] / dist[free], dy[free] / dist[free], dist[free])
+            i, j, dx, dy, dist = i[~free], j[~free], dx[~free], dy[~free], dist[~free]
+        return count
+
+    def _resolve(self, i, j, nx, ny, dist):
+        # Swap the velocity components along the line of centres for approaching pairs
+        closing = (self.vx[i] - self.vx[j]) * nx + (self.vy[i] - self.vy[j]) * ny
+        closing = np.maximum(closing, 0.0)
+        for vel, normal in ((self.vx, nx), (self.vy, ny)):
+            vel[i] -= closing * normal
+            vel[j] += closing * normal
+
+        # Push the pair apart so it doesn't stick together
+        push = (2 * PARTICLE_RADIUS - dist) / 2
+        for pos, normal in ((self.x, nx), (self.y, ny)):
+            pos[i] -= push * normal
+            pos[j] += push * normal
+        return int(np.count_nonzero(closing))
+
+    def _ideal_wall_impulse(self):
+        """Momentum the walls should receive per frame by the ideal gas law, p = N m<v²> / 2A.
+
+        Colliding particles take up room, so the prediction includes the 2D
+        hard-disk virial term (1 + πd²N / 2A).
+        """
+        # The centres bounce off a box PARTICLE_RADIUS inside the bounds
+        width = self.bounds.width - 2 * PARTICLE_RADIUS
+        height = self.bounds.height - 2 * PARTICLE_RADIUS
+        area = width * height
+        pressure = len(self) * float(np.mean(self.vx ** 2 + self.vy ** 2)) / (2 * area)
+        if self.collisions:
+            pressure *= 1 + math.pi * (2 * PARTICLE_RADIUS) ** 2 * len(self) / (2 * area)
+        return pressure * 2 * (width + height)
+
+    def pressure_ratio(self):
+        """Measured over predicted wall pressure for the last PRESSURE_WINDOW frames.
+
+        Stays close to 1, so it scales the level's pV = Nk_BT answer into a
+        "measured" pressure.
+        """
+        predicted = sum(ideal for _, ideal in self.wall_impulses)
+        if not predicted:
+            return None
+        return sum(measured for measured, _ in self.wall_impulses) / predicted
+
+    def colour_buckets(self):
+        ratio = np.clip(self.speeds() / MAX_COLOUR_SPEED, 0.0, 1.0)
+        return (ratio * (COLOUR_BUCKETS - 1)).astype(np.intp)
+
+    def draw(self, screen, color=None, alpha=None, offset=(0, 0)):
+        """Stamp every particle in one blits() call, coloured by speed unless `color` is given."""
+        if color is not None:
+            sprites = [dot_sprite(color)] * len(self)
+        else:
+            palette = bucket_sprites(alpha)
+            sprites = [palette[b] for b in self.colour_buckets().tolist()]
+        xs = (self.x - (offset[0] + PARTICLE_RADIUS)).astype(np.intp).tolist()
+        ys = (self.y - (offset[1] + PARTICLE_RADIUS)).astype(np.intp).tolist()
+        screen.blits(zip(sprites, zip(xs, ys)), doreturn=False)
 
 # === Visual Effects ===
+TRAIL_FADE = (255, 255, 255, 30)  # 10–30 for stronger fade, lower = longer trails
+# Fades it takes any trail pixel to reach solid white, the same as the box
+# background, after which fading or drawing it changes nothing
+TRAIL_SETTLE_FRAMES = 32
+TRAIL_TILE = 32  # trail damage is tracked in tiles this many pixels square
+
+_fade_surfaces = {}
+
+
+def fade_surface(size):
+    """The TRAIL_FADE overlay for a trail of `size`, built once per size."""
+    surface = _fade_surfaces.get(size)
+    if surface is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(TRAIL_FADE)
+        _fade_surfaces[size] = surface
+    return surface
+
+
 class VisualEffectsMixin:
-    def __init__(self, bounds: pygame.Rect):
+    """Fading particle trails, redrawn only where they have changed recently.
+
+    The trail surface covers `trail_area` on screen (the bounds, unless the
+    bounds move around inside a bigger area) and is never reallocated. It is
+    split into tiles; only tiles a particle was stamped on in the last
+    TRAIL_SETTLE_FRAMES frames get faded and copied to the screen, the rest
+    are already plain white.
+    """
+
+    def __init__(self, bounds: pygame.Rect, trail_area=None):
         self.bounds = bounds
-        self.trail_surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
-        self.trail_surface.fill((0, 0, 0, 0))
+        self.trail_area = (trail_area or bounds).copy()
+        self.trail_surface = pygame.Surface(self.trail_area.size, pygame.SRCALPHA)
+        self.trail_surface.fill((255, 255, 255, 255))  # already settled
+        self.fade_surface = fade_surface(self.trail_area.size)
+        rows = -(-self.trail_area.height // TRAIL_TILE)
+        cols = -(-self.trail_area.width // TRAIL_TILE)
+        # Frames since each tile was last drawn on, capped once it has settled
+        self.tile_age = np.full((rows, cols), TRAIL_SETTLE_FRAMES + 1, dtype=np.int16)
 
     def draw_gradient_background(self, screen):
         screen.fill((255, 255, 255), self.bounds)
 
+    def _mark_tiles(self, particles):
+        # A dot can straddle up to four tiles, so mark the tile under each corner
+        rows, cols = self.tile_age.shape
+        left, top = self.trail_area.topleft
+        for dx in (-PARTICLE_RADIUS, PARTICLE_RADIUS - 1):
+            tx = np.clip((particles.x + (dx - left)) // TRAIL_TILE, 0, cols - 1).astype(np.intp)
+            for dy in (-PARTICLE_RADIUS, PARTICLE_RADIUS - 1):
+                ty = np.clip((particles.y + (dy - top)) // TRAIL_TILE, 0, rows - 1).astype(np.intp)
+                self.tile_age[ty, tx] = 0
+
+    def _dirty_rects(self):
+        """Trail-surface rects covering every unsettled tile, one per run of tiles in a row."""
+        active = self.tile_age <= TRAIL_SETTLE_FRAMES
+        if active.all():
+            return [self.trail_surface.get_rect()]
+        rects = []
+        for row in np.flatnonzero(active.any(axis=1)).tolist():
+            # Start and end columns of each run of active tiles
+            edges = np.flatnonzero(np.diff(active[row].astype(np.int8), prepend=0, append=0)).tolist()
+            for first, last in zip(edges[::2], edges[1::2]):
+                rects.append(pygame.Rect(first * TRAIL_TILE, row * TRAIL_TILE,
+                                         (last - first) * TRAIL_TILE, TRAIL_TILE))
+        return rects
+
     def draw_trails(self, screen, particles):
-        fade_surface = pygame.Surface(self.bounds.size, pygame.SRCALPHA)
-        fade_surface.fill((255, 255, 255, 30))  # 10–30 for stronger fade, lower = longer trails
-        self.trail_surface.blit(fade_surface, (0, 0))
-
-        for p in particles:
-            speed = (p.vx**2 + p.vy**2)**0.5
-            color = p.speed_to_colour(speed)
-            pygame.draw.circle(
-                self.trail_surface,
-                color + (100,),
-                (int(p.x - self.bounds.left), int(p.y - self.bounds.top)),
-                PARTICLE_RADIUS
-            )
-
-        screen.blit(self.trail_surface, self.bounds.topleft)
+        np.minimum(self.tile_age + 1, TRAIL_SETTLE_FRAMES + 1, out=self.tile_age)
+        self._mark_tiles(particles)
+        # Fading a settled tile changes nothing, so the tiles about to be drawn
+        # on can be faded along with the ones still settling
+        dirty = self._dirty_rects()
+        for rect in dirty:
+            self.trail_surface.blit(self.fade_surface, rect, rect)
+
+        particles.draw(self.trail_surface, alpha=100, offset=self.trail_area.topleft)
+
+        # Settled tiles are white like the background, so only copy the rest
+        visible = self.bounds.move(-self.trail_area.left, -self.trail_area.top)
+        for rect in dirty:
+            rect = rect.clip(visible)
+            if rect:
+                screen.blit(self.trail_surface, rect.move(self.trail_area.topleft), rect)
 
     def draw_bounds_box(self, screen):
         pygame.draw.rect(screen, (0, 0, 0), self.bounds, 2)
 
 # === Simulators ===
 class GasSimulator(VisualEffectsMixin, BaseSimulator):
-    def __init__(self, bounds: pygame.Rect, num_particles=30):
+    def __init__(self, bounds: pygame.Rect, num_particles=30, collisions=False):
         VisualEffectsMixin.__init__(self, bounds)
         BaseSimulator.__init__(self)
-        self.particles = self._create_particles(num_particles)
-
-    def _create_particles(self, num_particles):
-        return [
-            Particle(
-                random.randint(self.bounds.left + PARTICLE_RADIUS, self.bounds.right - PARTICLE_RADIUS),
-                random.randint(self.bounds.top + PARTICLE_RADIUS, self.bounds.bottom - PARTICLE_RADIUS),
-                random.choice([-1, 1]) * random.uniform(1.0, 2.0),
-                random.choice([-1, 1]) * random.uniform(1.0, 2.0),
-                self.bounds
-            ) for _ in range(num_particles)
-        ]
+        self.particles = self._create_particles(num_particles, collisions)
+
+    def _create_particles(self, num_particles, collisions=False):
+        return ParticleSystem(num_particles, self.bounds, 1.0, 2.0, collisions)
 
     def update(self):
-        for p in self.particles:
-            p.move()
+        self.particles.move()
 
     def draw(self, screen):
         self.draw_gradient_background(screen)
         self.draw_trails(screen, self.particles)
         self.draw_bounds_box(screen)
 
-        for p in self.particles:
-            p.draw(screen)
+        self.particles.draw(screen)
 
 class VelocityDistributionSimulator(BaseSimulator, VisualEffectsMixin):
-    def __init__(self, bounds, num_particles=30):
+    def __init__(self, bounds, num_particles=30, collisions=False):
         self.bounds = bounds
         VisualEffectsMixin.__init__(self, bounds)
-        self.particles = self._create_particles(num_particles)
-
-    def _create_particles(self, num_particles):
-        return [
-            Particle(
-                random.randint(self.bounds.left + PARTICLE_RADIUS, self.bounds.right - PARTICLE_RADIUS),
-                random.randint(self.bounds.top + PARTICLE_RADIUS, self.bounds.bottom - PARTICLE_RADIUS),
-                random.choice([-1, 1]) * random.uniform(0.5, 3.0),
-                random.choice([-1, 1]) * random.uniform(0.5, 3.0),
-                self.bounds
-            ) for _ in range(num_particles)
-        ]
+        self.particles = self._create_particles(num_particles, collisions)
+
+    def _create_particles(self, num_particles, collisions=False):
+        return ParticleSystem(num_particles, self.bounds, 0.5, 3.0, collisions)
 
     def update(self):
-        for p in self.particles:
-            p.move()
+        self.particles.move()
 
     def draw(self, screen):
         self.draw_gradient_background(screen)
         self.draw_trails(screen, self.particles)
-        for p in self.particles:
-            p.draw(screen)                        
+        self.particles.draw(screen)
         self.draw_bounds_box(screen)              
 
 class VolumeChangeSimulator(BaseSimulator, VisualEffectsMixin):
-    def __init__(self, bounds: pygame.Rect, num_particles=30):
-        VisualEffectsMixin.__init__(self, bounds) 
+    def __init__(self, bounds: pygame.Rect, num_particles=30, collisions=False):
+        # The trail covers the biggest the box gets, so resizing never touches it
+        grow = bounds.width // 10 + 2
+        VisualEffectsMixin.__init__(self, bounds, trail_area=bounds.inflate(grow, grow))
         self.initial_bounds = bounds.copy()
         self.bounds = bounds.copy()
-        self.particles = self._create_particles(num_particles)
+        self.particles = self._create_particles(num_particles, collisions)
         self.growing = False
         self.frame_count = 0
 
-    def _create_particles(self, num_particles):
-        return [
-            Particle(
-                random.randint(self.bounds.left + PARTICLE_RADIUS, self.bounds.right - PARTICLE_RADIUS),
-                random.randint(self.bounds.top + PARTICLE_RADIUS, self.bounds.bottom - PARTICLE_RADIUS),
-                random.choice([-1, 1]) * random.uniform(1.0, 2.0),
-                random.choice([-1, 1]) * random.uniform(1.0, 2.0),
-                self.bounds
-            ) for _ in range(num_particles)
-        ]
+    def _create_particles(self, num_particles, collisions=False):
+        return ParticleSystem(num_particles, self.bounds, 1.0, 2.0, collisions)
 
     def update(self):
-        old_size = self.bounds.size
         center = self.bounds.center 
 
         if self.growing:
@@ -221,46 +440,29 @@ class VolumeChangeSimulator(BaseSimulator, VisualEffectsMixin):
 
         self.bounds.center = center
 
-        if self.bounds.size != old_size:
-            old_surface = self.trail_surface
-            self.trail_surface = pygame.Surface(self.bounds.size, pygame.SRCALPHA)
-            self.trail_surface.fill((0, 0, 0, 0))
-
-            scaled_old = pygame.transform.smoothscale(old_surface, self.bounds.size)
-            self.trail_surface.blit(scaled_old, (0, 0))
-
-        for p in self.particles:
-            p.bounds = self.bounds
-            p.move()
+        self.particles.bounds = self.bounds
+        self.particles.move()
 
         self.frame_count += 1
 
     def draw(self, screen):
         self.draw_gradient_background(screen)
         self.draw_trails(screen, self.particles) 
-        for p in self.particles:
-            p.draw(screen)                        
+        self.particles.draw(screen)
         self.draw_bounds_box(screen)              
 
 class TemperatureSimulator(BaseSimulator, VisualEffectsMixin):
-    def __init__(self, bounds: pygame.Rect, num_particles=30, initial_temp=300):
+    def __init__(self, bounds: pygame.Rect, num_particles=30, initial_temp=300, collisions=False):
         VisualEffectsMixin.__init__(self, bounds)
         self.bounds = bounds
         self.temperature = initial_temp
-        self.particles = self._create_particles(num_particles)
+        self.particles = self._create_particles(num_particles, collisions)
         self.frame_count = 0
         self.temp_increasing = True  # Direction flag for oscillation
+        self.font = pygame.font.SysFont(None, 24)
 
-    def _create_particles(self, num_particles):
-        return [
-            Particle(
-                random.randint(self.bounds.left + PARTICLE_RADIUS, self.bounds.right - PARTICLE_RADIUS),
-                random.randint(self.bounds.top + PARTICLE_RADIUS, self.bounds.bottom - PARTICLE_RADIUS),
-                random.choice([-1, 1]) * random.uniform(0.5, 1.5),
-                random.choice([-1, 1]) * random.uniform(0.5, 1.5),
-                self.bounds
-            ) for _ in range(num_particles)
-        ]
+    def _create_particles(self, num_particles, collisions=False):
+        return ParticleSystem(num_particles, self.bounds, 0.5, 1.5, collisions)
 
     def update(self):
         # Oscillate temperature between 200K and 1000K
@@ -278,17 +480,8 @@ class TemperatureSimulator(BaseSimulator, VisualEffectsMixin):
         speed_factor = ((self.temperature / 300) ** 0.5) * exaggeration
         base_speed = 1.0
 
-        for p in self.particles:
-            current_speed = (p.vx ** 2 + p.vy ** 2) ** 0.5
-            desired_speed = base_speed * speed_factor
-            if current_speed > 0:
-                scale = desired_speed / current_speed
-                p.vx *= scale
-                p.vy *= scale
-            else:
-                p.vx = random.choice([-1, 1]) * desired_speed
-                p.vy = random.choice([-1, 1]) * desired_speed
-            p.move()
+        self.particles.set_speed(base_speed * speed_factor)
+        self.particles.move()
 
         self.frame_count += 1
 
@@ -296,30 +489,24 @@ class TemperatureSimulator(BaseSimulator, VisualEffectsMixin):
         self.draw_gradient_background(screen)
         self.draw_trails(screen, self.particles)
 
-        # Smooth color gradient: blue (cold) to red (hot)
+        # Smooth color gradient: blue (cold) to red (hot), in the shared colour buckets
         ratio = (self.temperature - 200) / (1000 - 200)
         ratio = max(0, min(1, ratio))
-        color = (
-            int(255 * ratio),
-            0,
-            int(255 * (1 - ratio))
-        )
+        color = BUCKET_COLOURS[round(ratio * (COLOUR_BUCKETS - 1))]
 
-        for p in self.particles:
-            p.draw(screen, color=color)
+        self.particles.draw(screen, color=color)
 
         self.draw_bounds_box(screen)
 
         # Temperature display
-        font = pygame.font.SysFont(None, 24)
-        temp_text = font.render(f"T = {int(self.temperature)} K", True, BLACK)
+        temp_text = self.font.render(f"T = {int(self.temperature)} K", True, BLACK)
         screen.blit(temp_text, (self.bounds.left, self.bounds.top - 25))
 
 # === Level Data ===
 levels = {
-    1: {"N": 1e23, "T": 300, "V": 0.01, "num_particles": 30, "desc": "Calculate the Pressure for Gas at Room Temperature", "simulator_class": GasSimulator},
-    2: {"N": 2e23, "T": 350, "V": 0.02, "num_particles": 40, "desc": "Calculate the Pressure for Hotter Gas with More Molecules", "simulator_class": VelocityDistributionSimulator},
-    3: {"N": 1.5e23, "T": 250, "V": 0.015, "num_particles": 35, "desc": "Cooler Gas in Smaller Container", "simulator_class": VolumeChangeSimulator},
+    1: {"N": 1e23, "T": 300, "V": 0.01, "num_particles": 30, "collisions": True, "desc": "Calculate the Pressure for Gas at Room Temperature", "simulator_class": GasSimulator},
+    2: {"N": 2e23, "T": 350, "V": 0.02, "num_particles": 500, "collisions": True, "desc": "Calculate the Pressure for Hotter Gas with More Molecules", "simulator_class": VelocityDistributionSimulator},
+    3: {"N": 1.5e23, "T": 250, "V": 0.015, "num_particles": 35, "collisions": True, "desc": "Cooler Gas in Smaller Container", "simulator_class": VolumeChangeSimulator},
     4: {"N": 1e23, "T": 500, "V": 0.025, "m": 4.65e-26, "num_particles": 50, "desc": "Given the Mass m = 4.65e-26kg of an individual particle, Calculate the Root Mean Square Speed:", "simulator_class": TemperatureSimulator},
 }
 
@@ -332,6 +519,7 @@ class GameUI(BaseUI):
         self.feedback = ''
         self.correct = False
         self.level_num = level_num
+        self.pressure_ratio = None  # measured / ideal pressure from the simulator
         self.update_level(level_data, level_num)
 
     def update_level(self, level_data, level_num=None):
@@ -389,6 +577,11 @@ class GameUI(BaseUI):
         screen.blit(txt_surface, (self.input_box.x + 5, self.input_box.y + 5))
         screen.blit(self.font.render(self.feedback, True, BLACK), (150, 200))
 
+        # Once solved, show the pressure the particles actually put on the walls
+        if self.correct and hasattr(self, "V") and self.pressure_ratio is not None:
+            measured = self.pressure_ratio * self.correct_answer
+            screen.blit(self.font.render(f"Measured in the simulation: {measured:.3g} Pa", True, BLACK), (300, 200))
+
 
 # === GameApp ===
 class GameApp:
@@ -409,7 +602,8 @@ class GameApp:
     def load_level(self, level_num):
         level_data = self.levels[level_num]
         sim_class = level_data.get("simulator_class", GasSimulator)
-        self.simulator = sim_class(pygame.Rect(100, 250, 600, 300), level_data["num_particles"])
+        self.simulator = sim_class(pygame.Rect(100, 250, 600, 300), level_data["num_particles"],
+                                   collisions=level_data.get("collisions", False))
         self.ui = GameUI(self.font, pygame.Rect(450, 130, 140, 32), level_data, level_num)  # pass level_num here
 
     async def run(self):
@@ -419,6 +613,7 @@ class GameApp:
 
             self.simulator.update()
             self.simulator.draw(self.screen)
+            self.ui.pressure_ratio = self.simulator.particles.pressure_ratio()
             self.ui.draw(self.screen)
 
             if self.ui.correct:
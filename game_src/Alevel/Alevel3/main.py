@@ -1,20 +1,22 @@
 import pygame
 import asyncio
 import os
+import sys
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 async def main():
     pygame.init()
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
     WIDTH, HEIGHT = 800, 640
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Rocket Launch Quiz")
 
     try:
-        bg = pygame.image.load(os.path.join(ASSET_DIR,"controlroomdark.png"))
-        bg = pygame.transform.scale(bg, (WIDTH, HEIGHT))
+        bg = Assets(BASE_DIR).image('bg')
     except:
         bg = pygame.Surface((WIDTH, HEIGHT))
         bg.fill((0, 0, 0))
@@ -3,10 +3,13 @@ import pygame
 import asyncio
 import time
 import os
+import sys
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 pygame.init()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
 WIDTH, HEIGHT = 800, 640
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -16,8 +19,7 @@ font = pygame.font.SysFont("arial", 22)
 font_bold = pygame.font.SysFont("arial", 24, bold=True)
 
 try:
-    bg_image = pygame.image.load(os.path.join(ASSET_DIR,"marsland.png"))
-    bg_image = pygame.transform.scale(bg_image, (WIDTH, HEIGHT))
+    bg_image = Assets(BASE_DIR).image('bg_image')
 except:
     bg_image = None
 
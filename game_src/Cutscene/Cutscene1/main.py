@@ -1,7 +1,11 @@
 import pygame
 import os
+import sys
 import time
 import asyncio
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 pygame.init()
 pygame.mixer.init()
@@ -14,22 +18,15 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
 # Load images separately
-cutscene1 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene1.png'))
-cutscene1 = pygame.transform.scale(cutscene1, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene2 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene2.png'))
-cutscene2 = pygame.transform.scale(cutscene2, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene3 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene3.png'))
-cutscene3 = pygame.transform.scale(cutscene3, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene4 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene4.png'))
-cutscene4 = pygame.transform.scale(cutscene4, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene5 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene5.png'))
-cutscene5 = pygame.transform.scale(cutscene5, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene6 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene6.png'))
-cutscene6 = pygame.transform.scale(cutscene6, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene7 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene7.png'))
-cutscene7 = pygame.transform.scale(cutscene7, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene8 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene8.png'))
-cutscene8 = pygame.transform.scale(cutscene8, (SCREEN_WIDTH, SCREEN_HEIGHT))
+assets = Assets(BASE_DIR)
+cutscene1 = assets.image('cutscene1')
+cutscene2 = assets.image('cutscene2')
+cutscene3 = assets.image('cutscene3')
+cutscene4 = assets.image('cutscene4')
+cutscene5 = assets.image('cutscene5')
+cutscene6 = assets.image('cutscene6')
+cutscene7 = assets.image('cutscene7')
+cutscene8 = assets.image('cutscene8')
 
 # Load audio
 mixer_path = os.path.join(ASSET_DIR, "voiceover1.ogg")
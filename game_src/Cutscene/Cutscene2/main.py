@@ -1,7 +1,11 @@
 import pygame
 import os
+import sys
 import time
 import asyncio
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 pygame.init()
 pygame.mixer.init()
@@ -14,14 +18,11 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
 # Load images separately
-cutscene10 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene10.png'))
-cutscene10 = pygame.transform.scale(cutscene10, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene11 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene11.png'))
-cutscene11 = pygame.transform.scale(cutscene11, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene12 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene12.png'))
-cutscene12 = pygame.transform.scale(cutscene12, (SCREEN_WIDTH, SCREEN_HEIGHT))
-cutscene13 = pygame.image.load(os.path.join(ASSET_DIR, 'cutscene13.png'))
-cutscene13 = pygame.transform.scale(cutscene13, (SCREEN_WIDTH, SCREEN_HEIGHT))
+assets = Assets(BASE_DIR)
+cutscene10 = assets.image('cutscene10')
+cutscene11 = assets.image('cutscene11')
+cutscene12 = assets.image('cutscene12')
+cutscene13 = assets.image('cutscene13')
 
 # Load audio
 mixer_path = os.path.join(ASSET_DIR, "voiceover2.ogg")
@@ -3,6 +3,9 @@ import pygame
 import sys
 import os
 from js import window
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 async def main():
     pygame.init()
@@ -12,40 +15,18 @@ async def main():
     pygame.display.set_caption("Circuit Reassembly - Level 1")
 
     try:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-
-        control_room_bg = pygame.image.load(os.path.join(base_path, "assets", 'controlroomdark.png'))
-        control_room_bg = pygame.transform.scale(control_room_bg, (WIDTH, HEIGHT))
-
-        zoomed_background = pygame.image.load(os.path.join(base_path, "assets", 'cr4.png'))
-        zoomed_background = pygame.transform.scale(zoomed_background, (WIDTH, HEIGHT))
-
-        resistor_100k_image = pygame.image.load(os.path.join(base_path, "assets", '100kr.png'))
-        resistor_100k_image = pygame.transform.scale(resistor_100k_image, (80, 50))
-
-        resistor_100_image = pygame.image.load(os.path.join(base_path, "assets", '100r.png'))
-        resistor_100_image = pygame.transform.scale(resistor_100_image, (80, 50))
-
-        resistor_270_image = pygame.image.load(os.path.join(base_path, "assets", '270r.png'))
-        resistor_270_image = pygame.transform.scale(resistor_270_image, (80, 50))
-
-        resistor_330_image = pygame.image.load(os.path.join(base_path, "assets", '330r.png'))
-        resistor_330_image = pygame.transform.scale(resistor_330_image, (80, 50))
-
-        resistor_470_image = pygame.image.load(os.path.join(base_path, "assets", '47kres.png'))
-        resistor_470_image = pygame.transform.scale(resistor_470_image, (80, 50))
-
-        led_off_image = pygame.image.load(os.path.join(base_path, "assets", 'LEDOFF.png'))
-        led_off_image = pygame.transform.scale(led_off_image, (60, 70))
-
-        led_on_image = pygame.image.load(os.path.join(base_path, "assets", 'LEDON.png'))
-        led_on_image = pygame.transform.scale(led_on_image, (60, 70))
-
-        battery_image = pygame.image.load(os.path.join(base_path, "assets", 'source.png'))
-        battery_image = pygame.transform.scale(battery_image, (100, 100))
-
-        legend = pygame.image.load(os.path.join(base_path, "assets", 'legendr.png'))
-        legend = pygame.transform.scale(legend, (400, 300))
+        assets = Assets(os.path.dirname(os.path.abspath(__file__)))
+        control_room_bg = assets.image('control_room_bg')
+        zoomed_background = assets.image('zoomed_background')
+        resistor_100k_image = assets.image('resistor_100k')
+        resistor_100_image = assets.image('resistor_100')
+        resistor_270_image = assets.image('resistor_270')
+        resistor_330_image = assets.image('resistor_330')
+        resistor_470_image = assets.image('resistor_470')
+        led_off_image = assets.image('led_off')
+        led_on_image = assets.image('led_on')
+        battery_image = assets.image('battery')
+        legend = assets.image('legend')
 
     except pygame.error as e:
         print(f"Error loading images: {e}")
@@ -77,6 +58,11 @@ async def main():
     selected_component = None
     mouse_offset = (0, 0)
 
+    # Message panel for the overview, built once rather than every frame
+    msg_rect = pygame.Rect(90, 130, 620, 60)
+    overlay = pygame.Surface((msg_rect.width, msg_rect.height), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 180))
+
     running = True
     # Main async loop
     while running:
@@ -85,9 +71,6 @@ async def main():
         # Draw based on state
         if current_state == STATE_OVERVIEW:
             screen.blit(control_room_bg, (0, 0))
-            msg_rect = pygame.Rect(90, 130, 620, 60)
-            overlay = pygame.Surface((msg_rect.width, msg_rect.height), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 180))
             screen.blit(overlay, msg_rect.topleft)
             init_msg = font.render("The control board is not working! Click to fix it", True, WHITE)
             screen.blit(init_msg, (110, 140))
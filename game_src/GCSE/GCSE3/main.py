@@ -4,18 +4,19 @@ import sys
 import time
 import asyncio
 import os
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 pygame.init()
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ASSET_DIR = os.path.join(BASE_DIR, "assets")
 
 WIDTH, HEIGHT = 800, 640
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Rocket Launch Quiz")
 
 
-bg = pygame.image.load(os.path.join(ASSET_DIR,"controlroomdark.png"))
-bg = pygame.transform.scale(bg, (WIDTH, HEIGHT))
+bg = Assets(BASE_DIR).image('bg')
 
 
 font = pygame.font.SysFont("arial", 20)
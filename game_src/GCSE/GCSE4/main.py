@@ -3,6 +3,9 @@ import pygame
 import sys
 import os
 from js import window   # for the Pybag/browser handshake
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 async def main():
     pygame.init()
@@ -15,33 +18,17 @@ async def main():
     window.parent.postMessage("loaded", "*")
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    ASSET_DIR = os.path.join(BASE_DIR, "assets")
+    assets = Assets(BASE_DIR)
 
     # load & scale assets
-    background = pygame.image.load(os.path.join(ASSET_DIR, 'deepspace.png'))
-    background = pygame.transform.scale(background, (WIDTH, HEIGHT))
+    background = assets.image('background')
 
     planets = {
-        "Mars": pygame.transform.scale(
-            pygame.image.load(os.path.join(ASSET_DIR, 'mars2.png')),
-            (130, 130)
-        ),
-        "Saturn": pygame.transform.scale(
-            pygame.image.load(os.path.join(ASSET_DIR, 'saturn2.png')),
-            (140, 130)
-        ),
-        "Uranus": pygame.transform.scale(
-            pygame.image.load(os.path.join(ASSET_DIR, 'Uranus2.png')),  # match actual filename
-            (150, 130)
-        ),
-        "Alien Planet": pygame.transform.scale(
-            pygame.image.load(os.path.join(ASSET_DIR, 'alienplanet2.png')),
-            (130, 130)
-        ),
-        "Neptune": pygame.transform.scale(
-            pygame.image.load(os.path.join(ASSET_DIR, 'neptuno2.png')),
-            (135, 125)
-        ),
+        "Mars": assets.image('mars'),
+        "Saturn": assets.image('saturn'),
+        "Uranus": assets.image('uranus'),
+        "Alien Planet": assets.image('alien_planet'),
+        "Neptune": assets.image('neptune'),
     }
 
     planet_positions = {
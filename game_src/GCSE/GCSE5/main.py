@@ -1,5 +1,8 @@
 from js import window
 import pygame, math, asyncio, os, sys
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 # Initialize pygame
 pygame.init()
@@ -19,6 +22,7 @@ button_font = pygame.font.SysFont(None, 40)
 
 # Load rocket image
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+assets = Assets(BASE_DIR)
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
@@ -61,8 +65,7 @@ class Rocket:
         self.initial_pos = (x, y)
         
         try:
-            self.original_image = pygame.image.load(os.path.join(BASE_DIR, "assets", "0Rocket_Image.png")).convert_alpha()
-            self.image = pygame.transform.scale(self.original_image, (30, 50))
+            self.image = assets.image('rocket')
             self.base_image = self.image.copy()
         except FileNotFoundError:
             print("Failed to load rocket image, using rectangle instead")
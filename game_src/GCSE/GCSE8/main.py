@@ -1,7 +1,8 @@
 import pygame
 import math
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from collections import deque
+from typing import Dict, List, Tuple
 from js import window
 
 # ==================== Utility Functions ====================
@@ -12,6 +13,13 @@ def place_gear(x_center: float, y_center: float, radius1: float, radius2: float,
     y = y_center + (radius1 + radius2) * math.sin(angle)
     return x, y
 
+# Tooth tips stick out this far past a gear's radius
+TOOTH_LENGTH = 5
+# How close a tooth tip must come to another gear's rim to drive it
+MESH_TOLERANCE = 2.5
+# Gear sprites are cached for angles at most this far apart
+SPRITE_STEP = math.radians(2)
+
 # ==================== Interfaces and Base Classes ====================
 class Drawable(ABC):
     @abstractmethod
@@ -44,63 +52,138 @@ class Gear(Drawable, Updatable):
         self.angle = 0.0
         self.angular_velocity = 0.0
         self.active = False
+        # Unit vectors of the teeth at angle 0, rotated by self.angle when needed
+        self.tooth_offsets = [(math.cos(2 * math.pi * i / teeth), math.sin(2 * math.pi * i / teeth))
+                              for i in range(teeth)]
+        self._tips = None
+        self._tips_key = None
+        # Turning by one tooth looks the same, so the sprites only cover that
+        self.sprite_frames = max(1, math.ceil(2 * math.pi / teeth / SPRITE_STEP))
+        self.sprites = {}  # (frame, highlight, font) -> (Surface, top-left)
 
     def update(self, dt: float) -> None:
         if self.active:
             self.angle += self.angular_velocity * dt
 
-    def get_tooth_tips(self) -> List[Tuple[float, float]]:
-        return [
-            (
-                self.x + (self.radius + 5) * math.cos(2 * math.pi * i / self.teeth + self.angle),
-                self.y + (self.radius + 5) * math.sin(2 * math.pi * i / self.teeth + self.angle)
-            )
-            for i in range(self.teeth)
-        ]
+    def tooth_tips_at(self, angle: float) -> List[Tuple[float, float]]:
+        reach = self.radius + TOOTH_LENGTH
+        cos_a, sin_a = reach * math.cos(angle), reach * math.sin(angle)
+        return [(self.x + cx * cos_a - sx * sin_a, self.y + sx * cos_a + cx * sin_a)
+                for cx, sx in self.tooth_offsets]
 
-    def try_engage(self, gear_system: GearSystem) -> None:
-        if self.active:
-            return
-            
-        for other in gear_system.get_active_gears():
-            for tip in other.get_tooth_tips():
-                dx, dy = tip[0] - self.x, tip[1] - self.y
-                if abs(math.hypot(dx, dy) - self.radius) < 2.5:
-                    self.angular_velocity = -other.angular_velocity * other.radius / self.radius
-                    self.active = True
-                    return
+    def get_tooth_tips(self) -> List[Tuple[float, float]]:
+        key = (self.x, self.y, self.angle)
+        if key != self._tips_key:
+            self._tips = self.tooth_tips_at(self.angle)
+            self._tips_key = key
+        return self._tips
+
+    def is_driven_by(self, other: 'Gear') -> bool:
+        """True if other's tooth tips sweep within MESH_TOLERANCE of this gear's rim."""
+        distance = math.hypot(other.x - self.x, other.y - self.y)
+        reach = other.radius + TOOTH_LENGTH
+        # The tips' circle and the rim come that close somewhere unless one is well inside the other
+        return (abs(distance - reach) < self.radius + MESH_TOLERANCE
+                and distance + reach > self.radius - MESH_TOLERANCE)
 
     def draw(self, screen: pygame.Surface, font: pygame.font.Font, highlight: bool = False) -> None:
-        # Improved gear visuals
+        pitch = 2 * math.pi / self.teeth
+        frame = round(self.angle / pitch * self.sprite_frames) % self.sprite_frames
+        key = (frame, highlight, font)
+        if key not in self.sprites:
+            self.sprites[key] = self.render_sprite(frame * pitch / self.sprite_frames, font, highlight)
+        sprite, position = self.sprites[key]
+        screen.blit(sprite, position)
+
+    def render_sprite(self, angle: float, font: pygame.font.Font, highlight: bool) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """Draw the gear turned to angle on its own surface; returns it and where it goes on screen."""
         color = (255, 150, 150) if highlight else (180, 180, 200)
         border_color = (255, 200, 200) if highlight else (220, 220, 240)
-        
+        # Teeth end in circles of radius 4; a pixel on each side for rounding
+        half = int(self.radius) + TOOTH_LENGTH + 6
+        left, top = int(self.x) - half, int(self.y) - half
+        sprite = pygame.Surface((2 * half + 1, 2 * half + 1), pygame.SRCALPHA)
+        centre = (int(self.x) - left, int(self.y) - top)
         # Draw gear body with gradient effect
         for i in range(3, 0, -1):
-            pygame.draw.circle(screen, 
-                             (color[0]//i, color[1]//i, color[2]//i), 
-                             (int(self.x), int(self.y)), 
-                             int(self.radius - i + 1))
-        
+            pygame.draw.circle(sprite, (color[0]//i, color[1]//i, color[2]//i), centre, int(self.radius - i + 1))
+
         # Draw gear teeth
-        tooth_length = 8
-        for tx, ty in self.get_tooth_tips():
-            pygame.draw.line(screen, border_color, 
-                           (self.x, self.y), (tx, ty), 3)
-            pygame.draw.circle(screen, border_color, (int(tx), int(ty)), 4)
-        
+        for tx, ty in self.tooth_tips_at(angle):
+            pygame.draw.line(sprite, border_color, (self.x - left, self.y - top), (tx - left, ty - top), 3)
+            pygame.draw.circle(sprite, border_color, (int(tx) - left, int(ty) - top), 4)
+
         # Draw center hub
-        pygame.draw.circle(screen, (80, 80, 100), (int(self.x), int(self.y)), self.radius//4)
-        
+        pygame.draw.circle(sprite, (80, 80, 100), centre, self.radius//4)
+
         # Draw label with background
         label = font.render(self.label, True, (255, 255, 255))
         label_bg = pygame.Surface((label.get_width()+4, label.get_height()+4))
         label_bg.fill((0, 0, 0))
         label_bg.set_alpha(180)
-        screen.blit(label_bg, (self.x - label.get_width()//2 - 2, 
-                             self.y - label.get_height()//2 - 2))
-        screen.blit(label, (self.x - label.get_width()//2, 
-                           self.y - label.get_height()//2))
+        sprite.blit(label_bg, (self.x - left - label.get_width()//2 - 2, 
+                               self.y - top - label.get_height()//2 - 2))
+        sprite.blit(label, (self.x - left - label.get_width()//2, 
+                            self.y - top - label.get_height()//2))
+        return sprite, (left, top)
+
+class GearGrid:
+    """Buckets gears by position so meshing checks only look at gears nearby."""
+
+    def __init__(self, gears: List[Gear]):
+        self.gears = gears
+        # No two gears further apart than one cell can mesh
+        self.cell = max((2 * gear.radius + TOOTH_LENGTH + MESH_TOLERANCE for gear in gears), default=1)
+        self.cells = {}
+        for index, gear in enumerate(gears):
+            self.cells.setdefault(self._cell(gear), []).append(index)
+
+    def _cell(self, gear: Gear) -> Tuple[int, int]:
+        return int(gear.x // self.cell), int(gear.y // self.cell)
+
+    def near(self, gear: Gear) -> List[Gear]:
+        """Gears that could mesh with gear, in the order they were given."""
+        cx, cy = self._cell(gear)
+        indices = sorted(index for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                         for index in self.cells.get((cx + dx, cy + dy), ()))
+        return [self.gears[index] for index in indices if self.gears[index] is not gear]
+
+
+class GearTrain:
+    """Which gears the driver turns, and how fast, worked out from where the gears are."""
+
+    def __init__(self, gears: List[Gear], driver: Gear):
+        self.gears = gears
+        self.driver = driver
+        self.ratios = {}  # gear -> its angular velocity / the driver's
+        self._layout = None
+
+    def layout(self) -> Tuple[Tuple[float, float, float], ...]:
+        return tuple((gear.x, gear.y, gear.radius) for gear in self.gears)
+
+    def solve(self) -> Dict[Gear, float]:
+        """Velocity ratios of the gears the driver turns, found breadth-first through the meshes."""
+        layout = self.layout()
+        if layout != self._layout:
+            grid = GearGrid(self.gears)
+            self.ratios = {self.driver: 1.0}
+            queue = deque([self.driver])
+            while queue:
+                gear = queue.popleft()
+                for other in grid.near(gear):
+                    if other not in self.ratios and other.is_driven_by(gear):
+                        # Meshed rims move at the same speed, in opposite directions
+                        self.ratios[other] = -self.ratios[gear] * gear.radius / other.radius
+                        queue.append(other)
+            self._layout = layout
+        return self.ratios
+
+    def engage(self, angular_velocity: float) -> None:
+        """Turn the driver at angular_velocity, and with it every gear it meshes with."""
+        for gear, ratio in self.solve().items():
+            gear.angular_velocity = angular_velocity * ratio
+            gear.active = True
+
 
 class TextInputBox(Drawable, EventHandler):
     def __init__(self, x: int, y: int, width: int, height: int, font: pygame.font.Font):
@@ -139,6 +222,8 @@ class Level:
                  correct_moment: float, instructions: List[str], tolerance: float = 0.1):
         self.gears = gears
         self.target_gear = target_gear
+        self.train = GearTrain(gears, target_gear)
+        self.train.solve()
         self.input_box = input_box
         self.correct_moment = correct_moment
         self.instructions = instructions
@@ -152,8 +237,7 @@ class Level:
             entered = float(answer.strip())
             if abs(entered - self.correct_moment) < self.tolerance:
                 self.result_text = "Correct! Gears engaged."
-                self.target_gear.angular_velocity = 1.5
-                self.target_gear.active = True
+                self.train.engage(1.5)
                 self.moment_applied = True
                 self.complete = True
                 return True
@@ -412,7 +496,6 @@ class GearGame:
     def update(self) -> None:
         if self.current_level.moment_applied:
             for gear in self.current_level.gears:
-                gear.try_engage(self.current_level)
                 gear.update(1 / 60)
 
     def render(self) -> None:
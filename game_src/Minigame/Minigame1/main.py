@@ -1,9 +1,14 @@
 import pygame
 import os
+import sys
 import random
 from typing import List
 import asyncio
 from js import window
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
+from sprite_cache import SpriteCache
 
 "=== MINIGAME 1 ==="
 
@@ -18,18 +23,11 @@ from js import window
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-rocket_images = [pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Idle","0Rocket_Image.png")), (200, 300)),#0
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Background", "level_1.png")), (800, 640)),#1
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Flying", "0Rocket_Image.png")), (200, 300)),#2
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Flying", "1Rocket_Image.png")), (200, 300)),#3
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Death", "empty background.png")), (200, 300)),#4
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Hint", "Hint1.png")), (80, 120)),#5
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Hint", "Hint2.png")), (80, 120)),#6
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Asteroid1", "Idle", "0Meteor_Image.png")), (80, 120)),#7
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Asteroid1", "Moving", "0Meteor.png")), (80, 120)),#8
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Asteroid1", "Moving", "1Meteor.png")), (80, 120)),#9
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Asteroid1", "Moving", "2Meteor.png")), (80, 120)),#10
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Meteor", "Asteroid2", "Asteroid2.png")), (80, 120))]#11
+assets = Assets(BASE_DIR)
+
+sprite_cache = SpriteCache()
+# Enemy meteors fly at 70 degrees to the right or 250 degrees to the left
+METEOR_ANGLES = {1: 70, 0: 70, -1: 250}
 
 class Game:
     """Main game class that handles initialization and the game loop."""
@@ -96,17 +94,13 @@ class Game:
     def load_assets(self):
         """Load all game assets with forced hint visibility"""
         # Background
-        self.moving_background = rocket_images[1]
-        
+        self.moving_background = assets.image('background')
+        sprite_cache.prerender(assets.frames('meteor_moving'), set(METEOR_ANGLES.values()))
+
         # Hint images with fallback
         try:
-            self.hint_images = [
-                rocket_images[5],  # Hint1
-                rocket_images[6]   # Hint2
-            ]
-            # Scale hint images larger for better visibility
-            self.hint_images = [pygame.transform.scale(img, (80, 80)) for img in self.hint_images]
-        except pygame.error as e:
+            self.hint_images = [assets.image('hint1'), assets.image('hint2')]
+        except (OSError, pygame.error) as e:
             print(f"Error loading hint images: {e}")  # Log the error for debugging
             # Create bright placeholder if images fail to load
             self.hint_images = []
@@ -116,22 +110,6 @@ class Game:
                 pygame.draw.circle(surf, (255, 255, 0), (40, 40), 30)  # Yellow center
                 self.hint_images.append(surf)
 
-    def load_image(self, path: str, scale: float = 1.0) -> pygame.Surface:
-        """Load and scale an image with error handling"""
-        # Tries to load images using the given path, if that fails it loads a magenta colour of the same size
-        try:
-            image = pygame.image.load(path).convert_alpha()
-            if scale != 1.0:
-                new_size = (int(image.get_width() * scale), 
-                           int(image.get_height() * scale))
-                image = pygame.transform.scale(image, new_size)
-        except pygame.error as e:
-            print(f"Error loading image at {path}: {e}")
-            surf = pygame.Surface((50, 50), pygame.SRCALPHA)
-            surf.fill((255, 0, 255))  # Magenta error color
-            return surf
-            return surf
-
     def spawn_initial_objects(self):
         """Spawn objects with guaranteed hint meteors"""
         # Clear existing meteors
@@ -340,33 +318,28 @@ class Rocket(pygame.sprite.Sprite):
         
         # Load animations - uses dictionary
         self.animations = {
-            'Idle': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Idle'), 0.4),
-            'Flying': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Flying'), 0.4),
-            'Death': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Death'), 0.4)
+            'Idle': self.load_animation_frames('rocket_idle'),
+            'Flying': self.load_animation_frames('rocket_flying'),
+            'Death': self.load_animation_frames('rocket_death')
         }
         self.action = 0  # Start with Idle
         self.frame_index = 0
         self.update_time = pygame.time.get_ticks()
         self.rotation_angle = 0
-        
+        for frames in self.animations.values():
+            sprite_cache.prerender(frames, [-10, 10])  # Tilt while moving sideways
+
         self.image = self.animations['Idle'][0]
         self.rect = self.image.get_rect(center=(x, y))
     
-    def load_animation_frames(self, folder_path: str, scale: float) -> List[pygame.Surface]:
-        """Load animation frames from folder"""
-        frames = []
-        # Tries to find a image in the file directory provided, if that fails a placeholder is used
+    def load_animation_frames(self, name: str) -> List[pygame.Surface]:
+        """Load the animation frames listed under name in asset_manifest.json"""
+        # Tries to load the frames, if that fails a placeholder is used
         try:
-            for file in sorted(os.listdir(folder_path)):
-                if file.endswith('.png'):
-                    img = pygame.image.load(os.path.join(folder_path, file)).convert_alpha()
-                    img = pygame.transform.scale(img, (int(img.get_width() * scale), int(img.get_height() * scale)))
-                    frames.append(img)
+            return assets.frames(name)
         except OSError as e:
-            print(f"Error loading animation frames from {folder_path}: {e}")
-            frames.append(pygame.Surface((50, 80), pygame.SRCALPHA))
-            frames.append(pygame.Surface((50, 80), pygame.SRCALPHA))
-        return frames
+            print(f"Error loading animation frames {name}: {e}")
+            return [pygame.Surface((50, 80), pygame.SRCALPHA), pygame.Surface((50, 80), pygame.SRCALPHA)]
     
     def move(self) -> int:
         """Handle movement and return scroll amount"""
@@ -439,11 +412,9 @@ class Rocket(pygame.sprite.Sprite):
         
         # Apply rotation
         base_image = animation[self.frame_index]
+        self.image = sprite_cache.get(base_image, self.rotation_angle)
         if self.rotation_angle != 0:
-            self.image = pygame.transform.rotate(base_image, self.rotation_angle)
             self.rect = self.image.get_rect(center=self.rect.center)
-        else:
-            self.image = base_image
     
     def update_action(self, new_action: int):
         """Change animation state"""
@@ -498,8 +469,8 @@ class Meteor(pygame.sprite.Sprite):
             self.direction = random.choice([-1, 1])
             self.speed = random.uniform(4, 16)  # Change these arguments for min and max meteor speeds respectively
             self.animations = {
-                'Idle': [rocket_images[7]],  # Idle frames
-                'Moving': [rocket_images[8], rocket_images[9], rocket_images[10]]
+                'Idle': assets.frames('meteor_idle'),
+                'Moving': assets.frames('meteor_moving')
             }
             self.action = 1  # Always moving for enemies
             self.image = self.animations['Moving'][0]
@@ -508,21 +479,6 @@ class Meteor(pygame.sprite.Sprite):
         self.frame_index = 0
         self.update_time = pygame.time.get_ticks()
     
-    def load_animation_frames(self, folder_path: str) -> List[pygame.Surface]:
-        """Load animation frames for enemy meteors"""
-        frames = []
-        try:
-            for file in sorted(os.listdir(folder_path)):
-                if file.endswith('.png'):
-                    img = pygame.image.load(os.path.join(folder_path, file)).convert_alpha()
-                    img = pygame.transform.scale(img, (50, 50))
-                    frames.append(img)
-        except Exception as e:
-            print(f"Error loading animation frames from {folder_path}: {e}")
-            frames.append(pygame.Surface((50, 50), pygame.SRCALPHA))
-            frames.append(pygame.Surface((50, 50), pygame.SRCALPHA))
-        return frames
-    
     def spawn(self):
         """Initialize meteor starting position (enemies only)"""
         if self.meteor_type == 'Enemy':
@@ -545,12 +501,9 @@ class Meteor(pygame.sprite.Sprite):
             self.frame_index = (self.frame_index + 1) % len(self.animations['Moving'])
         
         base_image = self.animations['Moving'][self.frame_index]
-        
+
         # Apply rotation based on direction
-        if self.direction == -1:
-            self.image = pygame.transform.rotate(base_image, 250)
-        elif self.direction == 1 or self.direction == 0:
-            self.image = pygame.transform.rotate(base_image, 70)
+        self.image = sprite_cache.get(base_image, METEOR_ANGLES[self.direction])
     
     def update(self):
         """Update meteor position and animation"""
@@ -1,6 +1,10 @@
 import pygame
 import asyncio
 import os
+import sys
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
 
 
 # Initialize Pygame
@@ -30,15 +34,16 @@ clock = pygame.time.Clock()
 # Load rocket images from assets folder
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load images (using placeholder paths - replace with your actual paths)
+# Load images, all drawn at TILE x TILE
+assets = Assets(BASE_DIR)
 try:
-    player_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "astronaut.png")).convert_alpha()
-    coin_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "coin.png")).convert_alpha()
-    pitfall_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "pitfall.png")).convert_alpha()
-    wall_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "wall.jpg")).convert_alpha()
-    chatbot_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "chatbot.png")).convert_alpha()
-    hint1_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "Hint1.png")).convert_alpha()
-    hint2_img = pygame.image.load(os.path.join(BASE_DIR, "assets", "Hint2.png")).convert_alpha()
+    player_img = assets.image('player')
+    coin_img = assets.image('coin')
+    pitfall_img = assets.image('pitfall')
+    wall_img = assets.image('wall')
+    chatbot_img = assets.image('chatbot')
+    hint1_img = assets.image('hint1')
+    hint2_img = assets.image('hint2')
 except FileNotFoundError:
     # Create colored rectangles as fallback if images not found
     player_img = pygame.Surface((TILE, TILE))
@@ -56,14 +61,6 @@ except FileNotFoundError:
     hint2_img = pygame.Surface((TILE, TILE))
     hint2_img.fill(GREEN)
 
-player_img = pygame.transform.scale(player_img, (TILE, TILE))
-coin_img = pygame.transform.scale(coin_img, (TILE, TILE))
-pitfall_img = pygame.transform.scale(pitfall_img, (TILE, TILE))
-wall_img = pygame.transform.scale(wall_img, (TILE, TILE))
-chatbot_img = pygame.transform.scale(chatbot_img, (TILE, TILE))
-hint1_img = pygame.transform.scale(hint1_img, (TILE, TILE))
-hint2_img = pygame.transform.scale(hint2_img, (TILE, TILE))
-
 class Button:
     def __init__(self, x, y, width, height, text, color=BUTTON_COLOR, hover_color=BUTTON_HOVER):
         self.rect = pygame.Rect(x, y, width, height)
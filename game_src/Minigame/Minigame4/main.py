@@ -1,12 +1,29 @@
+# /// script
+# dependencies = [
+#     "numpy",
+# ]
+# ///
 import pygame
 import math
+import itertools
 import asyncio
 import random
-from typing import List, Tuple, Optional
+import numpy as np
+from typing import Iterator, List, Tuple, Optional
 from js import window
 
 "=== MINIGAME 4 ==="
 
+# Steps of 1/60 s the aiming preview looks ahead
+PREVIEW_STEPS = 1200
+# The preview is extended by at most this many steps a frame, so a drag costs
+# no more per frame than the old 100-step preview did
+PREVIEW_STEPS_PER_FRAME = 300
+# PhysicsWorld advances in steps of this many seconds, however long frames take
+PHYSICS_DT = 1 / 60.0
+# Frame time beyond this many steps is dropped, so a stalled tab doesn't fast-forward
+MAX_STEPS_PER_UPDATE = 5
+
 class Vec2:
     def __init__(self, x: float, y: float):
         self.x = x
@@ -50,52 +67,94 @@ def simulate_trajectory_in_temp_space(
     projectile_mass: float = 0.2,
     projectile_radius: float = 0.1,
     dt: float = 1/60.0,
-    max_steps: int = 100,
+    max_steps: int = PREVIEW_STEPS,
     screen_bounds: Tuple[int, int] = (800, 640)
 ) -> List[Tuple[int, int]]:
     """Simulates projectile trajectory with custom physics."""
-    body = PhysicsBody(init_position, projectile_mass)
-    body.velocity = init_velocity.copy()
+    return list(itertools.islice(
+        trajectory_steps(init_position, init_velocity, planets, projectile_mass, dt, screen_bounds),
+        max_steps))
 
-    points = []
 
-    for _ in range(max_steps):
-        total_force = Vec2(0, 0)
+def trajectory_steps(
+    init_position: Tuple[float, float],
+    init_velocity: Vec2,
+    planets: List['Planet'],
+    projectile_mass: float = 0.2,
+    dt: float = 1/60.0,
+    screen_bounds: Tuple[int, int] = (800, 640)
+) -> Iterator[Tuple[int, int]]:
+    """Yield the trajectory one point per step, until it leaves the screen or stalls.
 
-        for planet in planets:
-            direction = planet.position - body.position
-            distance = direction.length()
-            min_distance = planet.radius
-            max_distance = planet.gravity_field_radius
+    The same steps as PhysicsWorld.update and PhysicsBody.update, but on
+    plain floats: a Vec2 per operation would make a long preview slow.
+    """
+    x, y = init_position
+    vx, vy = init_velocity.x, init_velocity.y
+    fields = [(planet.position.x, planet.position.y, planet.radius, planet.gravity_field_radius,
+               planet.gravitational_field_strength) for planet in planets]
+
+    while True:
+        fx = fy = 0.0
+
+        for px, py, min_distance, max_distance, field_strength in fields:
+            dx, dy = px - x, py - y
+            distance = math.hypot(dx, dy)
 
             if min_distance <= distance < max_distance:
-                strength = max(planet.gravitational_field_strength / (distance ** 2), 5)
-                force = direction.normalized() * strength
-                total_force += force
+                strength = max(field_strength / (distance ** 2), 5)
+                fx += dx / distance * strength
+                fy += dy / distance * strength
             elif distance < min_distance:
                 # Simulate friction or collision slowdown
-                body.velocity = body.velocity * 0.87
+                vx *= 0.87
+                vy *= 0.87
 
-        body.apply_force(total_force)
-        body.update(dt)
+        vx += fx / projectile_mass * dt
+        vy += fy / projectile_mass * dt
+        x += vx * dt
+        y += vy * dt
 
-        x, y = body.position.int_tuple()
-        points.append((x, y))
+        point = (int(x), int(y))
+        yield point
 
         # Stop if out of bounds or velocity too low
-        if x < 0 or x > screen_bounds[0] or y < 0 or y > screen_bounds[1] or body.velocity.length() < 10:
-            break
-
-    return points
+        if (point[0] < 0 or point[0] > screen_bounds[0] or point[1] < 0 or point[1] > screen_bounds[1]
+                or math.hypot(vx, vy) < 10):
+            return
 
 
 class PhysicsBody:
+    """Position and velocity are stored in numpy rows, which a PhysicsWorld
+    swaps for rows of its own arrays when the body is added to it."""
     def __init__(self, position: Tuple[float, float], mass: float):
-        self.position = Vec2(*position)   # Current position in space
-        self.velocity = Vec2(0, 0)        # Current velocity
+        self._position = np.array(position, dtype=float)  # Current position in space
+        self._velocity = np.zeros(2)      # Current velocity
         self.mass = mass                  # Scalar mass
         self.force = Vec2(0, 0)           # Accumulated force
 
+    @property
+    def position(self) -> Vec2:
+        return Vec2(float(self._position[0]), float(self._position[1]))
+
+    @position.setter
+    def position(self, value: Vec2):
+        self._position[:] = (value.x, value.y)
+
+    @property
+    def velocity(self) -> Vec2:
+        return Vec2(float(self._velocity[0]), float(self._velocity[1]))
+
+    @velocity.setter
+    def velocity(self, value: Vec2):
+        self._velocity[:] = (value.x, value.y)
+
+    def bind(self, position: np.ndarray, velocity: np.ndarray):
+        """Keep position and velocity in the given rows from now on."""
+        position[:] = self._position
+        velocity[:] = self._velocity
+        self._position, self._velocity = position, velocity
+
     def apply_force(self, force: Vec2):
         """Accumulate a force vector to apply on next update."""
         self.force = self.force + force
@@ -172,19 +231,20 @@ class Game:
         self.running = True
         clock = pygame.time.Clock()
         
+        frame_time = 1/60.0
         while self.running:
             # Handle events
             await self._handle_events()
             
-            # Update physics
-            self.physics_world.update(1/60.0)
+            # Update physics by the time the last frame took
+            self.physics_world.update(frame_time)
             
             # Draw everything
             self._draw_frame()
             
             # Cap the frame rate
             await asyncio.sleep(1/60.0)
-            clock.tick(60)
+            frame_time = clock.tick(60) / 1000
         
         pygame.quit()
     
@@ -421,6 +481,11 @@ class Slingshot:
         self.position = constants.SLINGSHOT_POS
         self.loaded_projectile = None
         self.dragging = False
+        # Trajectory preview, the held position it was simulated from and
+        # the steps that extend it
+        self._preview_start = None
+        self._preview_points = []
+        self._preview_steps = iter(())
         
         # Physics tuning
         self.min_launch_speed = 300  # pixels/sec
@@ -499,59 +564,102 @@ class Slingshot:
         if not self.loaded_projectile or not self.loaded_projectile.body:
             return
 
-        # Compute initial velocity based on slingshot pull
-        pull_vector = self.position - self.loaded_projectile.body.position
-        velocity = self._calculate_launch_velocity(pull_vector)
-
-        points = simulate_trajectory_in_temp_space(
-            init_position=self.loaded_projectile.body.position.int_tuple(),
-            init_velocity=velocity,
-            planets=self.physics_world.planets,  # Must be full Planet objects
-            projectile_mass=self.loaded_projectile.mass,
-            projectile_radius=self.loaded_projectile.radius,
-            screen_bounds=(self.constants.WIDTH, self.constants.HEIGHT)
-        )
+        # The projectile is held at whole pixels and the planets don't move, so
+        # the preview only restarts when the held position changes. Otherwise
+        # it grows by PREVIEW_STEPS_PER_FRAME until it is PREVIEW_STEPS long.
+        start = self.loaded_projectile.body.position.int_tuple()
+        if start != self._preview_start:
+            # Compute initial velocity based on slingshot pull
+            pull_vector = self.position - self.loaded_projectile.body.position
+            velocity = self._calculate_launch_velocity(pull_vector)
+
+            self._preview_steps = trajectory_steps(
+                init_position=start,
+                init_velocity=velocity,
+                planets=self.physics_world.planets,  # Must be full Planet objects
+                projectile_mass=self.loaded_projectile.mass,
+                screen_bounds=(self.constants.WIDTH, self.constants.HEIGHT)
+            )
+            self._preview_points = []
+            self._preview_start = start
+        points = self._preview_points
+        steps = min(PREVIEW_STEPS_PER_FRAME, PREVIEW_STEPS - len(points))
+        if steps > 0:
+            points.extend(itertools.islice(self._preview_steps, steps))
 
         # Draw trajectory
         if len(points) > 1:
             pygame.draw.lines(surface, (255, 255, 255, 150), False, points, 2)
 
 class PhysicsWorld:
-    """Central manager for simple physics logic"""
+    """Central manager for simple physics logic
+
+    Projectile positions, velocities and masses, and the planets' positions,
+    field strengths and radii, are kept in numpy arrays with one row per
+    body. A step works out every projectile-planet pair at once, so it costs
+    a few array operations however many projectiles are flying. Steps are
+    always PHYSICS_DT long, so a launch plays out the same at any frame rate.
+    """
     def __init__(self, constants: GameConstants):
         self.constants = constants
         self.objects: List[Projectile] = []
         self.planets: List[Planet] = []
         self.active_projectiles = 0
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.masses = np.zeros(0)
+        self.planet_positions = np.zeros((0, 2))
+        self.planet_strengths = np.zeros(0)
+        self.planet_radii = np.zeros(0)
+        self.field_radii = np.zeros(0)
+        self.time_left = 0.0  # frame time not yet simulated
 
     def add_object(self, obj: Projectile):
         self.objects.append(obj)
         self.active_projectiles += 1
+        # Growing the arrays copies them, so every body moves to its new rows
+        self.positions = np.vstack([self.positions, np.zeros((1, 2))])
+        self.velocities = np.vstack([self.velocities, np.zeros((1, 2))])
+        self.masses = np.append(self.masses, obj.body.mass)
+        for i, other in enumerate(self.objects):
+            other.body.bind(self.positions[i], self.velocities[i])
 
     def add_planet(self, position: Vec2, gravitational_field_strength: float, radius: int):
         planet = Planet(position, gravitational_field_strength, radius)
         self.planets.append(planet)
+        self.planet_positions = np.vstack([self.planet_positions, [position.x, position.y]])
+        self.planet_strengths = np.append(self.planet_strengths, gravitational_field_strength)
+        self.planet_radii = np.append(self.planet_radii, planet.radius)
+        self.field_radii = np.append(self.field_radii, planet.gravity_field_radius)
 
     def update(self, dt: float):
-        for obj in self.objects:
-            if obj.should_remove:
-                continue
-
-            # Gravity from each planet
-            total_force = Vec2(0, 0)
-            for planet in self.planets:
-                direction = planet.position - obj.body.position
-                distance = direction.length()
-
-                if planet.radius <= distance < planet.gravity_field_radius:
-                    strength = max(planet.gravitational_field_strength / (distance ** 2), 5)
-                    total_force += direction.normalized() * strength
-                elif distance < planet.radius:
-                    # Simulate friction if inside planet
-                    obj.body.velocity = obj.body.velocity * 0.87
-
-            obj.body.apply_force(total_force)
-            obj.update(dt)
+        """Simulate dt seconds of frame time, in whole steps of PHYSICS_DT."""
+        self.time_left = min(self.time_left + dt, PHYSICS_DT * MAX_STEPS_PER_UPDATE)
+        while self.time_left >= PHYSICS_DT:
+            self.step(PHYSICS_DT)
+            self.time_left -= PHYSICS_DT
+
+    def step(self, dt: float):
+        if not self.objects:
+            return
+        moving = np.array([not obj.should_remove for obj in self.objects])
+
+        # Gravity from each planet: (projectile, planet, axis)
+        offsets = self.planet_positions[None, :, :] - self.positions[:, None, :]
+        distances = np.hypot(offsets[..., 0], offsets[..., 1])
+        in_field = (distances >= self.planet_radii) & (distances < self.field_radii)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strengths = np.maximum(self.planet_strengths / distances ** 2, 5)
+            pulls = offsets / distances[..., None] * strengths[..., None]
+        forces = np.where(in_field[..., None], pulls, 0.0).sum(axis=1)
+
+        # Simulate friction if inside planet, once for each planet it is inside
+        damping = 0.87 ** (distances < self.planet_radii).sum(axis=1)
+
+        velocities = self.velocities * damping[:, None] + forces / self.masses[:, None] * dt
+        # Assign in place: the bodies hold views of these arrays
+        self.velocities[moving] = velocities[moving]
+        self.positions[moving] += self.velocities[moving] * dt
 
     def draw(self, surface: pygame.Surface):
         for planet in self.planets:
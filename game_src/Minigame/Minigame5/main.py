@@ -1,11 +1,16 @@
 import pygame
 import os
+import sys
 import random
 from typing import List, Tuple, Dict, Optional, Literal
 import math
 from enum import Enum, auto
 import asyncio
 from js import window
+# game_src/common; tools/prepare_levels.py --stage puts a copy next to this file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'common'))
+from asset_loader import Assets
+from sprite_cache import SpriteCache
 
 "=== MINIGAME 5 ==="
 
@@ -18,11 +23,9 @@ from js import window
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-rocket_images = [pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Idle" ,"0Rocket_Image.png")), (200, 300)),#0
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Background", "level_1.png")), (800, 640)),#1
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Flying", "0Rocket_Image.png")), (200, 300)),#2
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Flying", "1Rocket_Image.png")), (200, 300)),#3
-                    pygame.transform.scale(pygame.image.load(os.path.join(BASE_DIR, "assets", "Rocket", "Death", "empty background.png")), (200, 300))]#4
+assets = Assets(BASE_DIR)
+
+sprite_cache = SpriteCache()
 
 class Game: 
     """Main game class that handles initialization and the game loop."""
@@ -93,23 +96,8 @@ class Game:
     def load_assets(self):
         """Load all game assets with forced hint visibility - extendable to more assets with different file paths"""
         # Background
-        self.moving_background = rocket_images[1]  # Background image
+        self.moving_background = assets.image('background')
 
-    def load_image(self, path: str, scale: float = 1.0) -> pygame.Surface:
-        """Load and scale an image with error handling"""
-        # Tries to load images using the given path, if that fails it loads a magenta colour of the same size in its place
-        try:
-            image = pygame.image.load(path).convert_alpha()
-            if scale != 1.0:
-                new_size = (int(image.get_width() * scale), 
-                           int(image.get_height() * scale))
-                image = pygame.transform.scale(image, new_size)
-            return image
-        except:
-            surf = pygame.Surface((50, 50), pygame.SRCALPHA)
-            surf.fill((255, 0, 255))  # Magenta error color
-            return surf
-        
     def spawn_enemy(self, enemy_type=None):
         """Enemy Spawn Logic"""
         if enemy_type is None:
@@ -375,27 +363,25 @@ class Rocket(pygame.sprite.Sprite):
         
         # Load animations
         self.animations = {
-            'Idle': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Idle'), 0.4),
-            'Flying': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Flying'), 0.4),
-            'Death': self.load_animation_frames(os.path.join(BASE_DIR, 'assets', 'Rocket', 'Death'), 0.4)
+            'Idle': self.load_animation_frames('rocket_idle'),
+            'Flying': self.load_animation_frames('rocket_flying'),
+            'Death': self.load_animation_frames('rocket_death')
         }
         self.action = 0  # Start with Idle
         self.frame_index = 0
         self.update_time = pygame.time.get_ticks()
         self.rotation_angle = 0
+        for frames in self.animations.values():
+            sprite_cache.prerender(frames, [-10, 10])  # Tilt while moving sideways
         self.image = self.animations['Idle'][0]
         self.rect = self.image.get_rect(center=(x, y))
     
-    def load_animation_frames(self, folder_path: str, scale: float) -> List[pygame.Surface]:
-        """Load animation frames from folder"""
-        frames = []
+    def load_animation_frames(self, name: str) -> List[pygame.Surface]:
+        """Load the animation frames listed under name in asset_manifest.json"""
         try:
-            for file in sorted(os.listdir(folder_path)):
-                if file.endswith('.png'):
-                    frames.append(self.game.load_image(os.path.join(folder_path, file), scale))
+            return assets.frames(name)
         except:
-            frames.append(pygame.Surface((50, 80), pygame.SRCALPHA))
-        return frames
+            return [pygame.Surface((50, 80), pygame.SRCALPHA)]
     
     def move(self) -> int:
         """Handle movement and return scroll amount"""
@@ -487,11 +473,9 @@ class Rocket(pygame.sprite.Sprite):
         
         # Apply rotation for when the rocket moves left and right
         base_image = animation[self.frame_index]
+        self.image = sprite_cache.get(base_image, self.rotation_angle)
         if self.rotation_angle != 0:
-            self.image = pygame.transform.rotate(base_image, self.rotation_angle)
             self.rect = self.image.get_rect(center=self.rect.center)
-        else:
-            self.image = base_image
     
     def update_action(self, new_action: int):
         """Change animation state"""
@@ -0,0 +1,152 @@
+"""Shared image loader for the game_src levels.
+
+Levels import it from game_src/common. pygbag only packages a level's own
+directory, so tools/prepare_levels.py --stage copies this file next to the
+main.py of every staged level.
+
+A level lists its images in asset_manifest.json, with paths relative to
+the level directory and the size the level draws them at. A list makes
+an animation:
+
+    {"images": {
+        "background": {"path": "assets/controlroomdark.png", "size": [800, 640]},
+        "led_on": {"path": "assets/LEDON.png", "size": [60, 70], "atlas": true},
+        "rocket_flying": [{"path": "assets/Rocket/Flying/0Rocket_Image.png", "size": [102, 102]},
+                          {"path": "assets/Rocket/Flying/1Rocket_Image.png", "size": [102, 102]}]
+    }}
+
+and asks for them by name:
+
+    assets = Assets(BASE_DIR)
+    screen.blit(assets.image('background'), (0, 0))
+
+Nothing is decoded until it is first asked for. Images are then scaled
+to their size, converted to the display's pixel format and memoised by
+(path, size). Opaque images of at least OPAQUE_MIN_AREA pixels, i.e.
+backgrounds, get convert() so they blit without blending; everything else
+gets convert_alpha(), because for small sprites SDL's alpha blitter beats
+its plain copy. Entries with "atlas": true are
+cut out of assets/atlas.png when tools/prepare_levels.py has packed one,
+which is one decode for all of them; without it they load on their own.
+
+In a level staged by tools/prepare_levels.py --stage, images that other
+levels use too are not in the bundle. shared_assets.json then says which
+file of the shared asset pack each one is, and where the page mounted the
+pack before starting the level.
+"""
+import json
+import os
+
+import pygame
+
+MANIFEST_NAME = 'asset_manifest.json'
+ATLAS_IMAGE = 'assets/atlas.png'
+ATLAS_INDEX = 'assets/atlas.json'
+SHARED_INDEX = 'shared_assets.json'
+# Measured crossover: below about 100x100 an opaque convert() blits slower than convert_alpha()
+OPAQUE_MIN_AREA = 96 * 96
+
+
+def sprite_key(path, size):
+    """How an image is named in the atlas index, e.g. "assets/LEDON.png@60x70"."""
+    return f"{path}@{size[0]}x{size[1]}" if size else path
+
+
+def is_opaque(surface):
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return True
+    # Bits are set where alpha > 254
+    return pygame.mask.from_surface(surface, 254).count() == surface.get_width() * surface.get_height()
+
+
+def load_scaled(path, size=None):
+    """Decode an image file and scale it, without converting it."""
+    surface = pygame.image.load(path)
+    if size and surface.get_size() != tuple(size):
+        surface = pygame.transform.scale(surface, size)
+    return surface
+
+
+class Assets:
+    def __init__(self, base_dir, manifest=MANIFEST_NAME):
+        self.base_dir = base_dir
+        path = os.path.join(base_dir, manifest)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'images': {}}
+        shared_path = os.path.join(base_dir, SHARED_INDEX)
+        if os.path.exists(shared_path):
+            with open(shared_path) as f:
+                self.shared = json.load(f)
+        else:
+            self.shared = {'mount': '', 'files': {}}
+        self.surfaces = {}  # (path, size) -> Surface
+        self.converted = set()  # keys whose surface is in the display format
+        self._atlas = None
+        self._atlas_index = None
+
+    def image(self, name):
+        """The surface for a single-image manifest entry."""
+        entry = self.manifest['images'][name]
+        return self.load(entry['path'], entry.get('size'), entry.get('atlas', False))
+
+    def frames(self, name):
+        """The surfaces of an animation (a list entry), in order."""
+        return [self.load(entry['path'], entry.get('size'), entry.get('atlas', False))
+                for entry in self.manifest['images'][name]]
+
+    def load(self, path, size=None, atlas=False):
+        """Load a file relative to the level directory, scaled to `size` (w, h)."""
+        size = tuple(size) if size else None
+        key = (path, size)
+        surface = self.surfaces.get(key)
+        if surface is not None and (key in self.converted or not pygame.display.get_surface()):
+            return surface
+
+        if surface is None:
+            surface = self._from_atlas(path, size) if atlas else None
+            if surface is None:
+                surface = load_scaled(self.locate(path), size)
+        # Images asked for before set_mode() stay unconverted until asked for again after it
+        if pygame.display.get_surface():
+            width, height = surface.get_size()
+            if width * height >= OPAQUE_MIN_AREA and is_opaque(surface):
+                surface = surface.convert()
+            else:
+                surface = surface.convert_alpha()
+            self.converted.add(key)
+        self.surfaces[key] = surface
+        return surface
+
+    def locate(self, path):
+        """The file for a path relative to the level: in the level, or in the shared pack."""
+        local = os.path.join(self.base_dir, path)
+        if path in self.shared['files'] and not os.path.exists(local):
+            return os.path.join(self.shared['mount'], self.shared['files'][path])
+        return local
+
+    def preload(self, names=None):
+        """Decode every manifest image (or just `names`) now, e.g. behind a loading screen."""
+        for name in names or self.manifest['images']:
+            if isinstance(self.manifest['images'][name], list):
+                self.frames(name)
+            else:
+                self.image(name)
+
+    def _from_atlas(self, path, size):
+        if self._atlas_index is None:
+            index_path = os.path.join(self.base_dir, ATLAS_INDEX)
+            self._atlas_index = {}
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    self._atlas_index = json.load(f)['sprites']
+        rect = self._atlas_index.get(sprite_key(path, size))
+        if rect is None:
+            return None
+        if self._atlas is None:
+            self._atlas = pygame.image.load(self.locate(ATLAS_IMAGE))
+            if pygame.display.get_surface():
+                self._atlas = self._atlas.convert_alpha()
+        return self._atlas.subsurface(rect)
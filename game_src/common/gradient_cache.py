@@ -0,0 +1,38 @@
+"""Memoised gradient backgrounds.
+
+Drawing a vertical gradient one pygame.draw.line() per pixel row costs
+several milliseconds a frame. gradient_surface() builds each (size, top,
+bottom) gradient once and hands back the same surface to blit:
+
+    draw_vertical_gradient(screen, LIGHT_BLUE, BLUE)
+
+Like asset_loader.py, levels import it from game_src/common and
+tools/prepare_levels.py --stage copies it into each staged level.
+"""
+import pygame
+
+_gradients = {}
+
+
+def gradient_surface(size, top_color, bottom_color):
+    """A vertical gradient from top_color to bottom_color, built once per (size, colours)."""
+    key = (tuple(size), tuple(top_color), tuple(bottom_color))
+    surface = _gradients.get(key)
+    if surface is None:
+        width, height = key[0]
+        # One pixel-wide strip of row colours, stretched across the width
+        strip = pygame.Surface((1, height))
+        for y in range(height):
+            ratio = y / height
+            strip.set_at((0, y), [int(top * (1 - ratio) + bottom * ratio)
+                                  for top, bottom in zip(top_color, bottom_color)])
+        surface = pygame.transform.scale(strip, (width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        _gradients[key] = surface
+    return surface
+
+
+def draw_vertical_gradient(surface, top_color, bottom_color):
+    """Draws a vertical gradient from top_color to bottom_color on the given surface."""
+    surface.blit(gradient_surface(surface.get_size(), top_color, bottom_color), (0, 0))
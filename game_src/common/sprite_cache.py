@@ -0,0 +1,44 @@
+"""Memoised rotated and scaled copies of sprites, for the minigames.
+
+pygame.transform.rotate() allocates and resamples a new surface on every
+call, which is most of a frame for a level rotating a dozen sprites. Asking
+a SpriteCache instead rounds the angle to ANGLE_STEP degrees and renders
+each (frame, angle, scale) once:
+
+    sprite_cache = SpriteCache()
+    sprite_cache.prerender(frames, [70, 250])
+    screen.blit(sprite_cache.get(frame, angle), position)
+
+Like asset_loader.py, levels import it from game_src/common and
+tools/prepare_levels.py --stage copies it into each staged level.
+"""
+from typing import List
+
+import pygame
+
+
+class SpriteCache:
+    """Rotated and scaled copies of animation frames, made once and reused"""
+    ANGLE_STEP = 5  # Angles are rounded to this many degrees
+
+    def __init__(self):
+        self.surfaces = {}
+
+    def get(self, frame: pygame.Surface, angle: float = 0, scale: float = 1.0) -> pygame.Surface:
+        """Return frame rotated by angle degrees and scaled, rendering it on first use"""
+        angle = round(angle / self.ANGLE_STEP) * self.ANGLE_STEP
+        if angle == 0 and scale == 1.0:
+            return frame
+        key = (frame, angle, scale)
+        if key not in self.surfaces:
+            if scale == 1.0:
+                self.surfaces[key] = pygame.transform.rotate(frame, angle)
+            else:
+                self.surfaces[key] = pygame.transform.rotozoom(frame, angle, scale)
+        return self.surfaces[key]
+
+    def prerender(self, frames: List[pygame.Surface], angles: List[float], scale: float = 1.0):
+        """Render every frame at every angle up front so nothing is rotated mid-game"""
+        for frame in frames:
+            for angle in angles:
+                self.get(frame, angle, scale)
@@ -0,0 +1,228 @@
+"""Versioned schema migrations for the tables app.py uses.
+
+Registered on the app as the `flask db` command group:
+
+    flask --app app db status       # applied and pending migrations
+    flask --app app db apply        # apply everything pending (or --to N)
+    flask --app app db rollback     # undo the latest migration (or --steps N)
+    flask --app app db check        # EXPLAIN every query in app.py, fail on full scans
+
+Each migration step is either a SQL string or a callable taking a cursor, for
+changes that depend on what is already there (MySQL has no
+CREATE INDEX IF NOT EXISTS). A migration whose down steps are None can't be
+rolled back.
+"""
+import ast
+import os
+
+import click
+from flask.cli import AppGroup
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# Queries in app.py that read a whole table on purpose, and why; `db check` skips them
+DELIBERATE_SCANS = {
+    "SELECT id, username FROM users WHERE id > %s ORDER BY id":
+        "load_usernames: the friend search index reloads every username",
+}
+
+# What `db check` puts in place of an f-string's {placeholders}, the %s list
+# the batch friend routes build for IN (...)
+SAMPLE_PLACEHOLDERS = '%s, %s'
+
+
+def _has_unique_key(cursor, table, columns):
+    cursor.execute(
+        "SELECT GROUP_CONCAT(column_name ORDER BY seq_in_index) FROM information_schema.statistics"
+        " WHERE table_schema = DATABASE() AND table_name = %s AND non_unique = 0"
+        " GROUP BY index_name",
+        (table,),
+    )
+    return ','.join(columns) in {row[0] for row in cursor.fetchall()}
+
+
+def _ensure_unique_key(table, name, columns):
+    # Tables created by hand before there was a schema may lack their keys
+    def step(cursor):
+        if not _has_unique_key(cursor, table, columns):
+            cursor.execute(f"ALTER TABLE {table} ADD UNIQUE KEY {name} ({', '.join(columns)})")
+    return step
+
+
+# (version, description, up steps, down steps or None), in order
+MIGRATIONS = [
+    (1, "create users and friends", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+            username VARCHAR(64) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            profile_icon VARCHAR(64) NOT NULL DEFAULT 'default.svg',
+            PRIMARY KEY (id),
+            UNIQUE KEY uq_users_username (username)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        # The primary key covers "friends of user1" and the duplicate check in add_friend
+        """
+        CREATE TABLE IF NOT EXISTS friends (
+            user1 VARCHAR(64) NOT NULL,
+            user2 VARCHAR(64) NOT NULL,
+            PRIMARY KEY (user1, user2)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        _ensure_unique_key('users', 'uq_users_username', ['username']),
+        _ensure_unique_key('friends', 'uq_friends_pair', ['user1', 'user2']),
+    ],
+        # The baseline adopts users and friends tables that may predate migrations,
+        # so undoing it by dropping them would delete those accounts
+        None),
+]
+
+
+def _run(cursor, step):
+    if callable(step):
+        step(cursor)
+    else:
+        cursor.execute(step)
+
+
+def applied_versions(db):
+    with db.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            " version INT NOT NULL PRIMARY KEY,"
+            " name VARCHAR(255) NOT NULL,"
+            " applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP"
+            ") ENGINE=InnoDB"
+        )
+        cursor.execute(f"SELECT version FROM {MIGRATIONS_TABLE}")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def apply(db, target=None):
+    done = applied_versions(db)
+    for version, name, up, _ in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        with db.cursor() as cursor:
+            for step in up:
+                _run(cursor, step)
+            cursor.execute(
+                f"INSERT INTO {MIGRATIONS_TABLE} (version, name) VALUES (%s, %s)", (version, name)
+            )
+        db.commit()
+        click.echo(f"applied {version:04d} {name}")
+
+
+def rollback(db, steps=1):
+    done = applied_versions(db)
+    undo = [migration for migration in reversed(MIGRATIONS) if migration[0] in done][:steps]
+    # Refuse before touching anything, rather than stop halfway
+    for version, name, _, down in undo:
+        if down is None:
+            raise click.ClickException(f"{version:04d} {name} can't be rolled back")
+    for version, name, _, down in undo:
+        with db.cursor() as cursor:
+            for step in down:
+                _run(cursor, step)
+            cursor.execute(f"DELETE FROM {MIGRATIONS_TABLE} WHERE version = %s", (version,))
+        db.commit()
+        click.echo(f"rolled back {version:04d} {name}")
+
+
+def _sql_text(node):
+    """The SQL of a literal or f-string argument, or None if it can't be worked out."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if not isinstance(node, ast.JoinedStr):
+        return None
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        elif isinstance(value.value, ast.Name) and value.value.id == 'placeholders':
+            parts.append(SAMPLE_PLACEHOLDERS)
+        else:
+            return None
+    return ''.join(parts)
+
+
+def app_queries(path):
+    """(line, query) for every cursor.execute() in a module; query is None if it isn't literal SQL."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute) and node.func.attr == 'execute'
+                and node.args):
+            query = _sql_text(node.args[0])
+            yield node.lineno, query and ' '.join(query.split())
+
+
+def _explained(query):
+    verb = query.split()[0].upper()
+    return verb in ('SELECT', 'UPDATE', 'DELETE') or (verb == 'INSERT' and ' SELECT ' in query.upper())
+
+
+def full_scans(db, path):
+    """(line, query, table, access type) for every query whose plan reads a whole table or index.
+
+    Queries listed in DELIBERATE_SCANS are not checked. A query that can't be
+    read from the source comes back with access type None.
+    """
+    problems = []
+    for lineno, query in sorted(app_queries(path), key=lambda item: item[0]):
+        if query is None:
+            problems.append((lineno, None, None, None))
+            continue
+        if not _explained(query) or query in DELIBERATE_SCANS:
+            continue
+        # The plan only depends on the shape of the query, not the values
+        sample = query.replace('%s', "'0'")
+        with db.cursor(dictionary=True) as cursor:
+            cursor.execute(f"EXPLAIN {sample}")
+            for row in cursor.fetchall():
+                # INSERT ... SELECT has a row for the table it writes, which isn't read
+                if row.get('select_type') != 'INSERT' and row.get('type') in ('ALL', 'index'):
+                    problems.append((lineno, query, row.get('table'), row['type']))
+    return problems
+
+
+def init_app(app, db):
+    cli = AppGroup('db', help="Schema migrations.")
+
+    @cli.command('status')
+    def status_command():
+        """List migrations and whether they are applied."""
+        done = applied_versions(db)
+        for version, name, _, _ in MIGRATIONS:
+            click.echo(f"[{'x' if version in done else ' '}] {version:04d} {name}")
+
+    @cli.command('apply')
+    @click.option('--to', 'target', type=int, help="Stop after this version.")
+    def apply_command(target):
+        """Apply pending migrations."""
+        apply(db, target)
+
+    @cli.command('rollback')
+    @click.option('--steps', default=1, show_default=True, help="How many migrations to undo.")
+    def rollback_command(steps):
+        """Undo the most recently applied migrations."""
+        rollback(db, steps)
+
+    @cli.command('check')
+    def check_command():
+        """Fail if any query in app.py needs a full table or index scan, or can't be checked."""
+        for query, reason in DELIBERATE_SCANS.items():
+            click.echo(f"allowed full scan ({reason}): {query}")
+        problems = full_scans(db, os.path.join(app.root_path, 'app.py'))
+        for lineno, query, table, access in problems:
+            if access is None:
+                click.echo(f"app.py:{lineno}: can't check a query that isn't literal SQL")
+            else:
+                click.echo(f"app.py:{lineno}: full {'index' if access == 'index' else 'table'} scan of {table}: {query}")
+        if problems:
+            raise click.ClickException(f"{len(problems)} queries fall back to a full scan or can't be checked")
+        click.echo("All queries use an index.")
+
+    app.cli.add_command(cli)
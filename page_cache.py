@@ -0,0 +1,79 @@
+"""Cache of rendered level, minigame and cutscene wrapper pages.
+
+These pages only differ by who is looking at them (the login/profile icon), so
+each template is rendered once per auth state and kept as bytes with an ETag.
+Templates are discovered by scanning their folders: a name that was not found
+is a cheap miss instead of a TemplateNotFound. Like game_builds, the folders
+are re-checked for changed mtimes at most every refresh_interval seconds.
+"""
+import hashlib
+import os
+import threading
+import time
+
+from flask import render_template
+
+# Auth state includes the user's icon name, so bound the number of variants
+MAX_PAGES = 2048
+
+
+class PageCache:
+    def __init__(self, app, folders, refresh_interval=10):
+        self.app = app
+        self.template_folder = os.path.join(app.root_path, app.template_folder)
+        self.folders = folders
+        self.refresh_interval = refresh_interval
+        self.templates = {}  # name -> mtime_ns
+        self.pages = {}  # (name, auth) -> (body, etag)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.scan()
+
+    def _walk(self):
+        for folder in self.folders:
+            root = os.path.join(self.template_folder, folder)
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    if filename.endswith('.html'):
+                        path = os.path.join(dirpath, filename)
+                        name = os.path.relpath(path, self.template_folder).replace(os.sep, '/')
+                        yield name, os.stat(path).st_mtime_ns
+
+    def scan(self):
+        """Pick up added/removed templates and drop pages whose template changed."""
+        templates = dict(self._walk())
+        stale = {name for name, mtime in self.templates.items() if templates.get(name) != mtime}
+        if stale:
+            # Jinja only reloads changed templates itself in debug mode
+            if self.app.jinja_env.cache is not None:
+                self.app.jinja_env.cache.clear()
+            self.pages = {key: page for key, page in self.pages.items() if key[0] not in stale}
+        self.templates = templates
+        self._checked_at = time.monotonic()
+
+    def _stale(self):
+        return bool(self.refresh_interval) and time.monotonic() - self._checked_at >= self.refresh_interval
+
+    def warm(self, auth=None):
+        with self.app.test_request_context():
+            for name in self.templates:
+                self.get(name, auth)
+
+    def get(self, name, auth=None):
+        """Return (body, etag) for a template, or None if there is no such page."""
+        if self._stale():
+            with self._lock:
+                # Threads that queued behind another scan find it done
+                if self._stale():
+                    self.scan()
+
+        if name not in self.templates:
+            return None
+        page = self.pages.get((name, auth))
+        if page is None:
+            body = render_template(name).encode('utf-8')
+            page = (body, hashlib.sha1(body).hexdigest())
+            if len(self.pages) >= MAX_PAGES:
+                self.pages = {}
+            self.pages[name, auth] = page
+        return page
@@ -0,0 +1,120 @@
+"""Password hashing with a configurable cost.
+
+PASSWORD_HASH_METHOD is any Werkzeug method string, e.g. "scrypt:32768:8:1"
+or "pbkdf2:sha256:600000". Hashes made with different parameters still
+verify, and are replaced with the configured method on the next successful
+login. `flask --app app passwords benchmark` suggests a method for a target
+verify time on the current machine.
+
+Verification runs on a small bounded thread pool (hashlib releases the GIL
+while hashing). Gunicorn runs threaded workers (see the Procfile). A login
+holds its request thread while its hash runs or waits in the pool's queue,
+so logins tie up at most 2 * PASSWORD_HASH_WORKERS threads of a worker, and
+the rest keep serving other requests as long as --threads is larger. Logins
+past that wait PASSWORD_HASH_QUEUE_TIMEOUT for a slot and then get HasherBusy.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask.cli import AppGroup
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Every hashing slot stayed busy for PASSWORD_HASH_QUEUE_TIMEOUT seconds."""
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.method = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_QUEUE_TIMEOUT', 0.0)
+        self.workers = app.config['PASSWORD_HASH_WORKERS']
+        self.queue_timeout = app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+        # Werkzeug fills in defaults ("pbkdf2" -> "pbkdf2:sha256:600000"), so
+        # take the prefix from a real hash to compare stored hashes against
+        self.method = _method_of(generate_password_hash('', method=app.config['PASSWORD_HASH_METHOD']))
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        app.cli.add_command(_cli)
+
+    def _run(self, fn, *args):
+        # At most `workers` hashes run at once and as many again may queue
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        # Created lazily so each gunicorn worker starts its own threads after fork
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        return _method_of(stored_hash) != self.method
+
+
+def _method_of(stored_hash):
+    return stored_hash.split('$', 1)[0]
+
+
+def _verify_time(method, rounds=3):
+    stored = generate_password_hash('benchmark-password', method=method)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        check_password_hash(stored, 'benchmark-password')
+    return (time.perf_counter() - start) / rounds
+
+
+def benchmark(algorithm, target):
+    """Cheapest method of `algorithm` whose verify takes at least `target` seconds."""
+    if algorithm == 'scrypt':
+        n = 2 ** 14
+        while True:
+            method = f'scrypt:{n}:8:1'
+            elapsed = _verify_time(method)
+            click.echo(f"  {method}: {elapsed * 1000:.1f} ms")
+            # Each verify holds 128 * n * r bytes, so stop at 128 MB per hash
+            if elapsed >= target or n >= 2 ** 17:
+                return method
+            n *= 2
+
+    iterations = 100_000
+    elapsed = _verify_time(f'pbkdf2:sha256:{iterations}')
+    click.echo(f"  pbkdf2:sha256:{iterations}: {elapsed * 1000:.1f} ms")
+    # pbkdf2 cost is linear in the iteration count
+    iterations = max(iterations, int(iterations * target / elapsed) // 10_000 * 10_000)
+    method = f'pbkdf2:sha256:{iterations}'
+    click.echo(f"  {method}: {_verify_time(method) * 1000:.1f} ms")
+    return method
+
+
+_cli = AppGroup('passwords', help="Password hashing.")
+
+
+@_cli.command('benchmark')
+@click.option('--target-ms', default=250, show_default=True, help="Target time for one verify.")
+@click.option('--algorithm', type=click.Choice(['scrypt', 'pbkdf2']), default='pbkdf2', show_default=True)
+def benchmark_command(target_ms, algorithm):
+    """Pick PASSWORD_HASH_METHOD for a target verify time on this machine."""
+    method = benchmark(algorithm, target_ms / 1000)
+    click.echo(f"\nPASSWORD_HASH_METHOD={method}")
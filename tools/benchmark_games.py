@@ -0,0 +1,247 @@
+"""Frame-time benchmarks for every GCSE, A-level and minigame level.
+
+    python tools/benchmark_games.py                      # compare with the baseline
+    python tools/benchmark_games.py Minigame/Minigame4   # only some levels
+    python tools/benchmark_games.py --update-baseline    # record a new baseline
+
+Each level runs headless (see headless.py) through its scripted scenario in
+benchmarks/scenarios.json, or sits idle if it has none. The first
+WARMUP_FRAMES frames, which include asset loading and first renders, are
+left out. Each level runs REPEATS times and the report keeps the best value
+of each statistic, because other processes on the machine only ever make
+a run slower. For each level the report gives:
+
+- p50/p95/p99 frame time in ms (update + render, headless.FrameTiming),
+  as CPU time of the game thread so being preempted doesn't count
+- surfaces allocated per frame: pygame.Surface(), pygame.transform.*,
+  pygame.image.load/from* and Font.render calls
+
+benchmarks/baseline.json stores those numbers with the time of a fixed
+calibration workload, run before each repeat, on the machine that recorded
+them. Baseline times are scaled by how much faster or slower the same
+workload runs now, which also absorbs a busy machine slowing down mid-run.
+A level fails if a percentile goes over its scaled baseline by more than
+--margin (MIN_SLACK_MS is added so sub-millisecond levels don't trip on
+timer noise), or if it allocates more than baseline * (1 + margin) +
+MIN_SLACK_ALLOCATIONS surfaces per frame. The games are meant for school
+Chromebooks running the WASM build, where a desktop's 2 ms frame can take
+20 ms, so small desktop regressions matter.
+
+A level over its limits is measured again and only reported if the best
+of both measurements is still over. The script exits with 1 on any
+regression. It also exits with 1 if a level
+that ran when the baseline was recorded now errors. Levels that could not
+start when the baseline was recorded (e.g. missing assets) are reported
+and skipped.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import headless
+from headless import pygame
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+SCENARIOS = os.path.join(BENCHMARKS, 'scenarios.json')
+BASELINE = os.path.join(BENCHMARKS, 'baseline.json')
+TIERS = ('GCSE', 'Alevel', 'Minigame')
+FRAMES = 600
+WARMUP_FRAMES = 60
+REPEATS = 3
+MARGIN = 0.25
+MIN_SLACK_MS = 0.5
+MIN_SLACK_ALLOCATIONS = 0.5
+
+# Functions that return a new surface on every call
+ALLOCATING = [
+    (pygame.transform, ['rotate', 'rotozoom', 'scale', 'smoothscale', 'flip', 'scale2x',
+                        'scale_by', 'smoothscale_by', 'chop', 'laplacian']),
+    (pygame.image, ['load', 'frombuffer', 'frombytes', 'fromstring']),
+]
+
+
+class BenchmarkRun(headless.Run):
+    """A headless run that also counts surface allocations per frame."""
+
+    # CPU time of this thread, so other processes preempting it don't count
+    clock = staticmethod(time.thread_time)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.allocations = 0
+        self.frame_allocations = []
+
+    def _counted(self, fn):
+        def wrapper(*args, **kwargs):
+            self.allocations += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def _install(self):
+        super()._install()
+        for module, names in ALLOCATING:
+            for name in names:
+                if hasattr(module, name):
+                    self._patch(module, name, self._counted(getattr(module, name)))
+
+        run = self
+
+        class Surface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                run.allocations += 1
+                super().__init__(*args, **kwargs)
+
+        class Font(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                run.allocations += 1
+                return super().render(*args, **kwargs)
+
+        self._patch(pygame, 'Surface', Surface)
+        self._patch(pygame.font, 'Font', Font)
+        # SysFont builds its fonts from the Font looked up in pygame.sysfont
+        self._patch(pygame.sysfont, 'Font', Font)
+
+    def pace(self):
+        if self.presented:
+            self.frame_allocations.append(self.allocations)
+            self.allocations = 0
+        super().pace()
+
+
+def levels_to_benchmark():
+    return [level for level in headless.discover() if level.split('/')[0] in TIERS]
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def calibrate(rounds=5, iterations=50):
+    """Best-of-`rounds` ms for a fixed mix of the work levels do in a frame.
+
+    The slowest levels spend their frame alpha-blending a full-screen
+    background loaded without convert(), so this blends one too, besides
+    small sprites, a rotation and some Python arithmetic.
+    """
+    screen = pygame.Surface((800, 600), 0, 32)
+    background = pygame.Surface((800, 600), pygame.SRCALPHA)
+    background.fill((30, 60, 90, 255))
+    sprite = pygame.Surface((64, 64), pygame.SRCALPHA)
+    sprite.fill((200, 120, 40, 180))
+    best = math.inf
+    for _ in range(rounds):
+        start = BenchmarkRun.clock()
+        for i in range(iterations):
+            screen.blit(background, (0, 0))
+            for j in range(50):
+                screen.blit(sprite, ((i * 7 + j * 13) % 736, (j * 11) % 536))
+            pygame.transform.rotate(sprite, i)
+            sum(k * k for k in range(2000))
+        best = min(best, BenchmarkRun.clock() - start)
+    return best * 1000 / iterations
+
+
+def _measure(level, script, frames, seed):
+    run = BenchmarkRun(level, frames + WARMUP_FRAMES, seed, headless.parse_events(script)).run()
+    if run.error:
+        return {'error': run.error.strip().splitlines()[-1]}
+    timings = run.timings[WARMUP_FRAMES:]
+    if not timings:
+        return {'error': f"only {len(run.timings)} frames (exit={run.exit})"}
+    frame_ms = [(t.update + t.render) * 1000 for t in timings]
+    allocations = run.frame_allocations[WARMUP_FRAMES:]
+    return {
+        'frames': len(frame_ms),
+        'p50': round(percentile(frame_ms, 50), 3),
+        'p95': round(percentile(frame_ms, 95), 3),
+        'p99': round(percentile(frame_ms, 99), 3),
+        'allocations': round(sum(allocations) / len(allocations), 2),
+    }
+
+
+def benchmark(level, script, frames=FRAMES, seed=0, repeats=REPEATS):
+    results = []
+    for _ in range(repeats):
+        calibration_ms = calibrate()
+        result = _measure(level, script, frames, seed)
+        if 'error' in result:
+            return result
+        result['calibration_ms'] = round(calibration_ms, 3)
+        results.append(result)
+    return {key: min(result[key] for result in results) for key in results[0]}
+
+
+def regressions(result, baseline, margin):
+    # How much slower this machine is now than when the baseline was recorded
+    scale = result['calibration_ms'] / baseline['calibration_ms']
+    problems = []
+    for key in ('p50', 'p95', 'p99'):
+        limit = baseline[key] * scale * (1 + margin) + MIN_SLACK_MS
+        if result[key] > limit:
+            problems.append(f"{key} {result[key]:.2f} ms > {limit:.2f} ms")
+    limit = baseline['allocations'] * (1 + margin) + MIN_SLACK_ALLOCATIONS
+    if result['allocations'] > limit:
+        problems.append(f"allocations {result['allocations']:.1f}/frame > {limit:.1f}")
+    return problems
+
+
+def _row(level, result):
+    if 'error' in result:
+        return f"{level:22} error: {result['error']}"
+    return (f"{level:22} p50 {result['p50']:7.2f}  p95 {result['p95']:7.2f}  p99 {result['p99']:7.2f} ms"
+            f"  {result['allocations']:6.1f} surfaces/frame")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark frame times of the game levels against a baseline.")
+    parser.add_argument('levels', nargs='*', help='levels as <Tier>/<Level> (default: every GCSE, Alevel and Minigame level)')
+    parser.add_argument('--frames', type=int, default=FRAMES, help='frames measured after the warm-up')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='runs per level; the best of each statistic is kept')
+    parser.add_argument('--margin', type=float, default=MARGIN, help='allowed slowdown over the baseline, as a fraction')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='record these results as the new baseline')
+    args = parser.parse_args()
+
+    with open(SCENARIOS) as f:
+        scenarios = json.load(f)
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+
+    results, failed = {}, False
+    for level in args.levels or levels_to_benchmark():
+        script = scenarios.get(level, [])
+        result = results[level] = benchmark(level, script, args.frames, args.seed, args.repeats)
+        print(_row(level, result))
+        if args.update_baseline:
+            continue
+        base = stored.get('levels', {}).get(level)
+        if base is None:
+            print("    no baseline")
+        elif 'error' in base:
+            print("    skipped: errored when the baseline was recorded")
+        elif 'error' in result:
+            failed = True
+            print("    REGRESSION: ran when the baseline was recorded")
+        elif regressions(result, base, args.margin):
+            # Measure again before blaming the code for one slow spell of the machine
+            again = benchmark(level, script, args.frames, args.seed, args.repeats)
+            result = results[level] = {key: min(result[key], again[key]) for key in result}
+            for problem in regressions(result, base, args.margin):
+                failed = True
+                print(f"    REGRESSION: {problem}")
+
+    if args.update_baseline:
+        levels = dict(stored.get('levels', {}), **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'levels': dict(sorted(levels.items()))}, f, indent=2)
+            f.write('\n')
+        print(f"wrote {args.baseline}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,534 @@
+"""Run game_src levels headless and deterministically for a fixed number of frames.
+
+    python tools/headless.py Minigame/Minigame1 --frames 600 --events script.json
+    python tools/headless.py --all --frames 120 --json timings.json
+
+Each level runs in this process exactly as pygbag would start it, with:
+
+- a stub `js` module that records every call (e.g. window.parent.postMessage)
+- SDL's dummy video and audio drivers
+- `random` (and numpy's global generator, if the level uses it) seeded
+- scripted input: events are handed out by pygame.event.get() on the frame
+  they are scheduled for, and pygame.key.get_pressed() and
+  pygame.mouse.get_pos() follow them
+- virtual time: Clock.tick(), asyncio.sleep(), pygame.time.get_ticks(),
+  pygame.time.delay() and time.time() advance 1/60 s per frame and never wait
+
+A frame ends at the first Clock.tick() or asyncio.sleep() after the level
+presents with display.flip()/update(). Within a frame, everything from the
+first fill/blit on the screen to the end counts as render time and
+everything before as update time. Levels that draw before they update list
+their update methods in UPDATE_HOOKS so that time is moved back to update.
+
+An events script is a JSON list of objects with a `frame` and a pygame
+event `type`, plus that event's attributes. Keys may be given by name:
+
+    [{"frame": 5, "type": "KEYDOWN", "key": "K_SPACE"},
+     {"frame": 40, "type": "KEYUP", "key": "K_SPACE"},
+     {"frame": 60, "type": "MOUSEBUTTONDOWN", "pos": [400, 300], "button": 1},
+     {"frame": 90, "type": "TEXT", "text": "1.2e5"}]
+
+TEXT is shorthand for one KEYDOWN per character, all on the same frame.
+"""
+import argparse
+import ast
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import traceback
+import types
+from collections import namedtuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame  # noqa: E402  (needs the drivers chosen first)
+
+GAME_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'game_src')
+FPS = 60
+FRAME_MS = 1000 / FPS
+
+# Methods whose time counts as update wherever they run in the frame
+UPDATE_HOOKS = {
+    # GameApp.run paints the background before updating the simulation
+    'Alevel/Alevel2': [
+        'GameApp._handle_events',
+        'GasSimulator.update',
+        'VelocityDistributionSimulator.update',
+        'VolumeChangeSimulator.update',
+        'TemperatureSimulator.update',
+    ],
+}
+
+FrameTiming = namedtuple('FrameTiming', 'update render')
+
+_real_sleep = asyncio.sleep
+_real_run = asyncio.run
+_active = None  # the Run currently executing
+
+
+class StopRun(BaseException):
+    """Ends a run from inside the level; not an Exception so the level can't catch it."""
+
+
+class LevelExit(BaseException):
+    """The level called pygame.quit()."""
+
+
+def discover(root=GAME_SRC):
+    """Every level as "<Tier>/<Level>", skipping placeholder (empty) main.py files."""
+    levels = []
+    for tier in sorted(os.listdir(root)):
+        tier_path = os.path.join(root, tier)
+        if not os.path.isdir(tier_path):
+            continue
+        for level in sorted(os.listdir(tier_path)):
+            path = os.path.join(tier_path, level, 'main.py')
+            if os.path.isfile(path) and os.path.getsize(path):
+                levels.append(f'{tier}/{level}')
+    return levels
+
+
+def _key(value):
+    return getattr(pygame, value) if isinstance(value, str) else value
+
+
+def parse_events(items):
+    """{frame: [pygame events]} from a list of script entries (see the module docstring)."""
+    by_frame = {}
+    for item in items:
+        item = dict(item)
+        frame = item.pop('frame')
+        kind = item.pop('type')
+        if kind == 'TEXT':
+            events = [pygame.event.Event(pygame.KEYDOWN, key=ord(c), unicode=c, mod=0, scancode=0)
+                      for c in item['text']]
+        else:
+            if 'key' in item:
+                item['key'] = _key(item['key'])
+                name = pygame.key.name(item['key'])
+                item.setdefault('unicode', name if len(name) == 1 else '')
+                item.setdefault('mod', 0)
+                item.setdefault('scancode', 0)
+            if kind.startswith('MOUSEBUTTON'):
+                item.setdefault('button', 1)
+            if 'pos' in item:
+                item['pos'] = tuple(item['pos'])
+            events = [pygame.event.Event(getattr(pygame, kind), item)]
+        by_frame.setdefault(frame, []).extend(events)
+    return by_frame
+
+
+class _JSStub:
+    """Stands in for any object reached through the browser's `js` module."""
+
+    def __init__(self, path):
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _JSStub(f'{self._path}.{name}')
+
+    def __call__(self, *args, **kwargs):
+        if _active is not None:
+            _active.js_calls.append((_active.frame, self._path, args))
+
+
+def _js_module():
+    module = types.ModuleType('js')
+    module.window = _JSStub('window')
+    module.__getattr__ = _JSStub  # PEP 562: js.anything else
+    return module
+
+
+class _Screen(pygame.Surface):
+    """The surface handed to the level instead of the display, to see when drawing starts."""
+
+    def fill(self, *args, **kwargs):
+        _active.mark_render()
+        return super().fill(*args, **kwargs)
+
+    def blit(self, *args, **kwargs):
+        _active.mark_render()
+        return super().blit(*args, **kwargs)
+
+    def blits(self, *args, **kwargs):
+        _active.mark_render()
+        return super().blits(*args, **kwargs)
+
+
+class _VirtualClock:
+    def __init__(self):
+        self._fps = 0
+
+    def tick(self, framerate=0):
+        _active.pace()
+        return round(FRAME_MS)
+
+    tick_busy_loop = tick
+
+    def get_time(self):
+        return round(FRAME_MS)
+
+    get_rawtime = get_time
+
+    def get_fps(self):
+        return float(FPS)
+
+
+class _HeldKeys:
+    def __init__(self, held):
+        self._held = held
+
+    def __getitem__(self, key):
+        return key in self._held
+
+    def __len__(self):
+        return 512
+
+
+class Run:
+    # Measures frame timings; benchmarks swap in time.thread_time
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self, level, frames=600, seed=0, events=None, update_hooks=None):
+        self.level = level
+        self.path = os.path.join(GAME_SRC, level, 'main.py')
+        self.target = frames
+        self.seed = seed
+        self.events = events or {}
+        self.update_hooks = UPDATE_HOOKS.get(level, []) if update_hooks is None else update_hooks
+        self.timings = []
+        self.js_calls = []
+        self.exit = None  # why the run ended: "frames", "quit", "sys.exit" or "returned"
+        self.error = None
+
+        self.frame = 0
+        self.virtual_ms = 0.0
+        self.pending = []
+        self.held = set()
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = [False, False, False]
+        self.presented = False
+        self.render_task = None
+        self.frame_start = self.render_start = None
+        self.hook_time = 0.0
+        self.module = None  # the level's globals, left for inspection after the run
+        self.host_task = None
+        self.tasks = []  # every task the level creates
+        self._patches = []
+
+    # --- frame bookkeeping ---
+
+    def _begin_frame(self):
+        self.pending = list(self.events.get(self.frame, ()))
+        for event in self.pending:
+            if event.type == pygame.KEYDOWN:
+                self.held.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.held.discard(event.key)
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and 1 <= event.button <= 3:
+                self.mouse_buttons[event.button - 1] = event.type == pygame.MOUSEBUTTONDOWN
+            if hasattr(event, 'pos'):
+                self.mouse_pos = event.pos
+        self.presented = False
+        self.render_start = None
+        self.hook_time = 0.0
+        self.frame_start = self.clock()
+
+    def mark_render(self):
+        if self.render_start is None:
+            self.render_start = self.clock()
+
+    def pace(self):
+        """A Clock.tick() or frame sleep: ends the frame if the level has presented one."""
+        if not self.presented:
+            return
+        now = self.clock()
+        start = self.render_start or now
+        self.timings.append(FrameTiming(start - self.frame_start + self.hook_time,
+                                        now - start - self.hook_time))
+        self.frame += 1
+        self.virtual_ms += FRAME_MS
+        if self.frame >= self.target:
+            self.exit = 'frames'
+            raise StopRun()
+        self._begin_frame()
+
+    def _timed(self, fn):
+        def wrapper(*args, **kwargs):
+            start = self.clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                # Only time spent after drawing started needs moving back to update
+                if self.render_start is not None:
+                    self.hook_time += self.clock() - max(start, self.render_start)
+        return wrapper
+
+    # --- stand-ins for pygame, asyncio and time ---
+
+    def _set_mode(self, size=(0, 0), *args, **kwargs):
+        display = self._real['set_mode'](size, *args, **kwargs)
+        self.screen = _Screen(display.get_size())
+        return self.screen
+
+    def _present(self, *args, **kwargs):
+        self.presented = True
+        try:
+            self.render_task = asyncio.current_task()
+        except RuntimeError:
+            self.render_task = None
+
+    def _get_events(self, eventtype=None, pump=True, exclude=None):
+        if eventtype is None and exclude is None:
+            events, self.pending = self.pending, []
+            return events
+        wanted = eventtype if isinstance(eventtype, (list, tuple)) else [eventtype]
+        unwanted = exclude if isinstance(exclude, (list, tuple)) else [exclude]
+        events = [e for e in self.pending
+                  if (eventtype is None or e.type in wanted) and e.type not in unwanted]
+        self.pending = [e for e in self.pending if e not in events]
+        return events
+
+    def _poll(self):
+        return self.pending.pop(0) if self.pending else pygame.event.Event(pygame.NOEVENT)
+
+    def _delay(self, ms):
+        self.virtual_ms += ms
+        return int(ms)
+
+    async def _sleep(self, delay, result=None):
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if self.presented and task is self.render_task:
+            # The level's own frame loop: the frame is over, and a longer
+            # sleep (a pause on a result screen) skips ahead in virtual time
+            self.pace()
+            self.virtual_ms += max(0.0, delay * 1000 - FRAME_MS)
+            await _real_sleep(0)
+        else:
+            # Anything else waits for the frames to catch up
+            wake = self.virtual_ms + delay * 1000
+            await _real_sleep(0)
+            while self.virtual_ms < wake:
+                await _real_sleep(0)
+        return result
+
+    def _schedule(self, coro, **kwargs):
+        # Like pygbag: the page's loop is already running, so asyncio.run() schedules
+        return asyncio.get_running_loop().create_task(coro)
+
+    def _quit(self):
+        # Scripts often call pygame.quit() right after asyncio.run(main()). In
+        # the browser that only runs once the game loop is over, so while
+        # scheduled loops are still going it is ignored.
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is self.host_task and not all(t.done() for t in self.tasks):
+            return
+        raise LevelExit()
+
+    def _patch(self, obj, name, value):
+        self._patches.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    def _install(self):
+        self._real = {'set_mode': pygame.display.set_mode}
+        sys.modules['js'] = _js_module()
+        self._patch(pygame.display, 'set_mode', self._set_mode)
+        self._patch(pygame.display, 'get_surface', lambda: self.screen)
+        self._patch(pygame.display, 'flip', self._present)
+        self._patch(pygame.display, 'update', self._present)
+        self._patch(pygame.event, 'get', self._get_events)
+        self._patch(pygame.event, 'poll', self._poll)
+        self._patch(pygame.event, 'pump', lambda: None)
+        self._patch(pygame.event, 'clear', lambda *a, **k: self.pending.clear())
+        self._patch(pygame.key, 'get_pressed', lambda: _HeldKeys(self.held))
+        self._patch(pygame.mouse, 'get_pos', lambda: self.mouse_pos)
+        self._patch(pygame.mouse, 'get_pressed', lambda num_buttons=3: tuple(self.mouse_buttons))
+        self._patch(pygame.time, 'Clock', _VirtualClock)
+        self._patch(pygame.time, 'get_ticks', lambda: int(self.virtual_ms))
+        self._patch(pygame.time, 'delay', self._delay)
+        self._patch(pygame.time, 'wait', self._delay)
+        self._patch(pygame, 'quit', self._quit)
+        self._patch(asyncio, 'sleep', self._sleep)
+        self._patch(asyncio, 'run', self._schedule)
+        start_epoch = 1_700_000_000.0
+        self._patch(time, 'time', lambda: start_epoch + self.virtual_ms / 1000)
+
+    def _uninstall(self):
+        while self._patches:
+            obj, name, value = self._patches.pop()
+            setattr(obj, name, value)
+        sys.modules.pop('js', None)
+
+    def _hook_updates(self, namespace):
+        for dotted in self.update_hooks:
+            owner_name, attr = dotted.rsplit('.', 1)
+            owner = namespace[owner_name]
+            setattr(owner, attr, self._timed(getattr(owner, attr)))
+
+    # --- running ---
+
+    def _compile(self):
+        with open(self.path) as f:
+            tree = ast.parse(f.read(), self.path)
+        # Split off a trailing `if __name__ == "__main__":` so hooks go in before it runs
+        main = None
+        last = tree.body[-1] if tree.body else None
+        if (isinstance(last, ast.If) and isinstance(last.test, ast.Compare)
+                and isinstance(last.test.left, ast.Name) and last.test.left.id == '__name__'):
+            main = tree.body.pop()
+        body = compile(tree, self.path, 'exec')
+        main = compile(ast.Module(body=[main], type_ignores=[]), self.path, 'exec') if main else None
+        return body, main
+
+    async def _host(self, module):
+        loop = asyncio.get_running_loop()
+        self.host_task = asyncio.current_task()
+        tasks = self.tasks
+
+        def track(loop, coro, **kwargs):
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+            tasks.append(task)
+            return task
+        loop.set_task_factory(track)
+
+        body, main = self._compile()
+        self._begin_frame()
+        exec(body, module.__dict__)
+        self._hook_updates(module.__dict__)
+        if main is not None:
+            exec(main, module.__dict__)
+
+        # Loops started with asyncio.run() or create_task() run from here
+        while self.exit is None and not all(t.done() for t in tasks):
+            idle_since = self.frame
+            for _ in range(1000):
+                await _real_sleep(0)
+                if self.frame != idle_since or self.exit is not None:
+                    break
+            else:
+                # Nothing presented a frame (e.g. every task is waiting on a
+                # timer), so let virtual time move on
+                self.virtual_ms += FRAME_MS
+
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                self._task_ended(task.exception())
+            else:
+                task.cancel()
+
+    def _task_ended(self, exc):
+        if exc is None or isinstance(exc, StopRun):
+            return
+        if isinstance(exc, LevelExit):
+            self.exit = self.exit or 'quit'
+        elif self.error is None:
+            self.error = ''.join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+
+    def run(self):
+        global _active
+        level_dir = os.path.dirname(self.path)
+        module = self.module = types.ModuleType('__main__')
+        module.__file__ = self.path
+        saved_main = sys.modules['__main__']
+        saved_cwd = os.getcwd()
+        known_modules = set(sys.modules)
+
+        random.seed(self.seed)
+        if 'numpy' in sys.modules:
+            sys.modules['numpy'].random.seed(self.seed)
+        _active = self
+        self._install()
+        sys.modules['__main__'] = module
+        sys.path.insert(0, level_dir)
+        os.chdir(level_dir)
+        try:
+            _real_run(self._host(module))
+        except StopRun:
+            pass
+        except LevelExit:
+            self.exit = self.exit or 'quit'
+        except SystemExit:
+            self.exit = self.exit or 'sys.exit'
+        except Exception as exc:
+            self._task_ended(exc)
+        finally:
+            os.chdir(saved_cwd)
+            sys.path.remove(level_dir)
+            sys.modules['__main__'] = saved_main
+            self._uninstall()
+            _active = None
+            pygame.quit()
+            # Forget the level's own helper modules so the next level gets its own
+            for name in set(sys.modules) - known_modules:
+                path = getattr(sys.modules[name], '__file__', None) or ''
+                if path.startswith(level_dir):
+                    del sys.modules[name]
+        if self.exit is None:
+            self.exit = 'error' if self.error else 'returned'
+        return self
+
+
+def run_level(level, frames=600, seed=0, events=(), update_hooks=None):
+    """Run one level ("<Tier>/<Level>") headless and return its Run."""
+    return Run(level, frames, seed, parse_events(events), update_hooks).run()
+
+
+def _summary(run):
+    n = len(run.timings)
+    if not n:
+        return f"{run.level:24} {n:5d} frames  exit={run.exit}"
+    update = sum(t.update for t in run.timings) / n * 1000
+    render = sum(t.render for t in run.timings) / n * 1000
+    worst = max(t.update + t.render for t in run.timings) * 1000
+    return (f"{run.level:24} {n:5d} frames  update {update:7.3f} ms  render {render:7.3f} ms"
+            f"  worst {worst:7.2f} ms  exit={run.exit}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run game_src levels headless for a fixed number of frames.")
+    parser.add_argument('levels', nargs='*', help='levels as <Tier>/<Level>, e.g. Minigame/Minigame1')
+    parser.add_argument('--all', action='store_true', help='run every level')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--events', help='JSON events script, applied to every level run')
+    parser.add_argument('--json', help='write per-frame timings (seconds) to this file')
+    args = parser.parse_args()
+
+    levels = discover() if args.all else args.levels
+    if not levels:
+        parser.error('name some levels or pass --all')
+    script = []
+    if args.events:
+        with open(args.events) as f:
+            script = json.load(f)
+
+    results, failed = {}, False
+    for level in levels:
+        run = run_level(level, args.frames, args.seed, script)
+        print(_summary(run))
+        if run.error:
+            failed = True
+            print(run.error, file=sys.stderr)
+        results[level] = {
+            'exit': run.exit,
+            'error': run.error,
+            'js_calls': [[frame, path, [repr(a) for a in call_args]] for frame, path, call_args in run.js_calls],
+            'frames': [list(t) for t in run.timings],
+        }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
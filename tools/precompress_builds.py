@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always written
+    brotli = None
+
+GAME_ROOT = os.path.join('static', 'game')
+MANIFEST_NAME = 'manifest.json'
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+ENCODED_SUFFIXES = tuple(ENCODINGS.values())
+
+# Only keep a compressed copy if it saves at least this fraction of the file.
+# Most .apk bundles are zips of PNGs and barely shrink at all.
+MIN_SAVING = 0.05
+
+
+def find_build_dirs(root=GAME_ROOT):
+    """Yield every static/game/<Tier>/<Level>/build/web directory."""
+    for tier in sorted(os.listdir(root)):
+        tier_path = os.path.join(root, tier)
+        if not os.path.isdir(tier_path):
+            continue
+        for level in sorted(os.listdir(tier_path)):
+            build_dir = os.path.join(tier_path, level, 'build', 'web')
+            if os.path.isdir(build_dir):
+                yield build_dir
+
+
+def load_manifest(build_dir):
+    path = os.path.join(build_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_variant(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def compress_file(build_dir, name, previous):
+    """Write .br/.gz siblings for one file and return its manifest entry."""
+    path = os.path.join(build_dir, name)
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    # Unchanged since the last run, and the variants are still on disk
+    if previous and previous['sha256'] == digest and all(
+        os.path.exists(path + ENCODINGS[enc]) for enc in previous['encodings']
+    ):
+        return previous
+
+    entry = {'sha256': digest, 'size': len(data), 'encodings': {}}
+    candidates = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates['br'] = brotli.compress(data, quality=11)
+
+    for encoding, encoded in candidates.items():
+        variant = path + ENCODINGS[encoding]
+        if len(encoded) <= len(data) * (1 - MIN_SAVING):
+            write_variant(variant, encoded)
+            entry['encodings'][encoding] = len(encoded)
+        elif os.path.exists(variant):
+            os.remove(variant)
+    return entry
+
+
+def precompress_build(build_dir):
+    previous = load_manifest(build_dir)['files']
+    files = {}
+    for name in sorted(os.listdir(build_dir)):
+        if name == MANIFEST_NAME or name.endswith(ENCODED_SUFFIXES):
+            continue
+        if not os.path.isfile(os.path.join(build_dir, name)):
+            continue
+        files[name] = compress_file(build_dir, name, previous.get(name))
+
+    with open(os.path.join(build_dir, MANIFEST_NAME), 'w') as f:
+        json.dump({'files': files}, f, indent=2, sort_keys=True)
+    return files
+
+
+def best_size(entry):
+    return min([entry['size'], *entry['encodings'].values()])
+
+
+if __name__ == '__main__':
+    root = sys.argv[1] if len(sys.argv) > 1 else GAME_ROOT
+    if brotli is None:
+        print("brotli is not installed, writing gzip variants only")
+
+    total_before = total_after = 0
+    for build_dir in find_build_dirs(root):
+        files = precompress_build(build_dir)
+        before = sum(entry['size'] for entry in files.values())
+        after = sum(best_size(entry) for entry in files.values())
+        total_before += before
+        total_after += after
+        print(f"{build_dir}: {before} -> {after} bytes")
+
+    print(f"\nTotal: {total_before} -> {total_after} bytes")
@@ -0,0 +1,419 @@
+"""Prepare game_src levels for packaging with pygbag.
+
+    python tools/prepare_levels.py                 # every level with an asset_manifest.json
+    python tools/prepare_levels.py GCSE/GCSE1
+    python tools/prepare_levels.py --stage         # also write the copies to package to build/levels
+
+For each level that has an asset_manifest.json it packs the manifest's
+"atlas": true images, already scaled to their sizes, into assets/atlas.png
+and assets/atlas.json. asset_loader.py then decodes one sheet instead of
+one file per sprite. These two files are build output and are not committed.
+
+With --stage it also writes a copy of each level to build/levels/<Tier>/<Level>,
+to package with `pygbag --build build/levels/<Tier>/<Level>`, and prints how
+much smaller its bundle is. Levels are always packaged from their staged
+copy, because pygbag only packages the level's own directory: the copy
+gets game_src/common/*.py next to its main.py. From the source tree the
+levels import game_src/common directly. A level that loads no images but
+imports from game_src/common (Alevel2) has an empty manifest so that it is
+staged too. In the copy, also:
+
+- manifest images are scaled down to the one size they are drawn at, with
+  the same transform.scale() the loader would use, so the game looks the
+  same and skips the scale at runtime. Images drawn at several sizes keep
+  their resolution.
+- images that are only drawn from the atlas are left out.
+- PNGs are recompressed, as palette PNGs when that is lossless. This needs
+  Pillow; without it they are re-saved by pygame.
+- .ogg audio is transcoded to --audio-bitrate. This needs ffmpeg; without
+  it audio is copied as it is.
+
+A file is only replaced when the result is smaller. The source tree is never
+modified, so the originals stay available for later changes.
+
+Manifest images that come out byte-identical in two or more of the staged
+levels (backgrounds, planets, rocket sprites) then move to one shared asset
+pack, build/levels/shared/pack/build/web/shared-<hash>.apk (under the --stage
+directory). The pack's files are named by their content hash, and so is the
+pack. Each staged level gets a shared_assets.json, which asset_loader.py reads
+to find the files. Stage all levels in one run so they share one pack: only
+such a run removes the packs earlier runs left, because a run on some of the
+levels leaves the others pointing at the old pack. Build the staged levels with
+
+    pygbag --template tools/pygbag/shared_assets.tmpl --build build/levels/<Tier>/<Level>
+
+That template is pygbag's default plus mounting the shared pack before
+the level starts. Commit the pack with the rebuilt levels, copied to
+static/game/shared/pack/build/web, where it is served as /play shared/pack/...
+and cached by the browser like any hashed build file.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import zipfile
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, images are then re-saved by pygame
+    Image = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_SRC = os.path.join(ROOT, 'game_src')
+COMMON = os.path.join(GAME_SRC, 'common')
+sys.path.insert(0, COMMON)
+import asset_loader  # noqa: E402
+
+ATLAS_WIDTH = 1024
+STAGE_ROOT = os.path.join(ROOT, 'build', 'levels')
+# Never copied into a staged level
+STAGE_SKIP = ('build', '__pycache__')
+# The audio is voiceovers, which stay clear at this bitrate
+AUDIO_BITRATE = '32k'
+AUDIO_SUFFIXES = ('.ogg',)
+# Under the stage directory, laid out like the level builds in static/game
+SHARED_PACK_DIR = os.path.join('shared', 'pack', 'build', 'web')
+SHARED_URL = '/play shared/pack/'
+# Where shared_assets.tmpl mounts the pack in the browser
+SHARED_MOUNT = '/data/data/shared'
+# Smaller files are not worth a lookup in another archive
+MIN_SHARED_SIZE = 4096
+
+
+def levels_with_manifest(root=GAME_SRC):
+    levels = []
+    for tier in sorted(os.listdir(root)):
+        tier_path = os.path.join(root, tier)
+        if not os.path.isdir(tier_path) or tier_path == COMMON:
+            continue
+        for level in sorted(os.listdir(tier_path)):
+            if os.path.isfile(os.path.join(tier_path, level, asset_loader.MANIFEST_NAME)):
+                levels.append(f'{tier}/{level}')
+    return levels
+
+
+def common_modules():
+    return sorted(name for name in os.listdir(COMMON) if name.endswith('.py'))
+
+
+def vendor(level_dir):
+    """Copy the common modules into a staged level."""
+    for name in common_modules():
+        shutil.copyfile(os.path.join(COMMON, name), os.path.join(level_dir, name))
+
+
+def atlas_entries(manifest):
+    """(path, size) of every image marked "atlas": true, without duplicates."""
+    entries = []
+    for entry in manifest['images'].values():
+        for item in entry if isinstance(entry, list) else [entry]:
+            if item.get('atlas'):
+                key = (item['path'], tuple(item['size']) if item.get('size') else None)
+                if key not in entries:
+                    entries.append(key)
+    return entries
+
+
+def shelf_pack(sizes, width=ATLAS_WIDTH):
+    """Top-left corners for rectangles of `sizes`, in rows tallest first; returns (positions, height)."""
+    width = max([width] + [w for w, _ in sizes])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        positions[i] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+
+def pack_atlas(level_dir, manifest):
+    """Write assets/atlas.png and atlas.json; returns how many sprites went in."""
+    image_path = os.path.join(level_dir, asset_loader.ATLAS_IMAGE)
+    index_path = os.path.join(level_dir, asset_loader.ATLAS_INDEX)
+    entries, sprites = [], []
+    for path, size in atlas_entries(manifest):
+        try:
+            sprites.append(asset_loader.load_scaled(os.path.join(level_dir, path), size))
+        except FileNotFoundError:
+            # Left out, so the level fails on it the same way with or without an atlas
+            print(f"{os.path.relpath(level_dir, GAME_SRC)}: missing {path}")
+            continue
+        entries.append((path, size))
+    if not entries:
+        for path in (image_path, index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        return 0
+
+    positions, height = shelf_pack([sprite.get_size() for sprite in sprites])
+    width = max(x + sprite.get_width() for (x, _), sprite in zip(positions, sprites))
+    sheet = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+    sheet.fill((0, 0, 0, 0))
+    index = {}
+    for (path, size), sprite, (x, y) in zip(entries, sprites, positions):
+        # Give opaque sprites an alpha channel, then copy pixels exactly:
+        # max() against the cleared sheet is the sprite itself, where a
+        # normal blit would blend translucent pixels into it
+        rgba = pygame.Surface(sprite.get_size(), pygame.SRCALPHA, 32)
+        rgba.fill((0, 0, 0, 0))
+        rgba.blit(sprite, (0, 0))
+        if not sprite.get_flags() & pygame.SRCALPHA:
+            sprite = rgba
+        sheet.blit(sprite, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        index[asset_loader.sprite_key(path, size)] = [x, y, sprite.get_width(), sprite.get_height()]
+    pygame.image.save(sheet, image_path)
+    with open(index_path, 'w') as f:
+        json.dump({'sprites': index}, f, indent=2)
+        f.write('\n')
+    return len(index)
+
+
+def image_sizes(manifest):
+    """Path -> every size (or None for "as is") the manifest draws it at."""
+    sizes = {}
+    for entry in manifest['images'].values():
+        for item in entry if isinstance(entry, list) else [entry]:
+            size = tuple(item['size']) if item.get('size') else None
+            sizes.setdefault(item['path'], set()).add(size)
+    return sizes
+
+
+def atlas_only(manifest, level_dir):
+    """Paths the loader only ever cuts out of the packed atlas."""
+    index_path = os.path.join(level_dir, asset_loader.ATLAS_INDEX)
+    if not os.path.exists(index_path):
+        return set()
+    with open(index_path) as f:
+        packed = json.load(f)['sprites']
+    paths, elsewhere = set(), set()
+    for entry in manifest['images'].values():
+        for item in entry if isinstance(entry, list) else [entry]:
+            size = tuple(item['size']) if item.get('size') else None
+            if item.get('atlas') and asset_loader.sprite_key(item['path'], size) in packed:
+                paths.add(item['path'])
+            else:
+                elsewhere.add(item['path'])
+    return paths - elsewhere
+
+
+def _same_pixels(path, surface):
+    saved = pygame.image.load(path)
+    alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+    if bool(saved.get_flags() & pygame.SRCALPHA) != alpha or saved.get_size() != surface.get_size():
+        return False
+    mode = 'RGBA' if alpha else 'RGB'
+    return pygame.image.tobytes(saved, mode) == pygame.image.tobytes(surface, mode)
+
+
+def save_png(surface, path):
+    """Save as small a PNG as is lossless for pygame."""
+    if Image is None:
+        pygame.image.save(surface, path)
+        return
+    mode = 'RGBA' if surface.get_flags() & pygame.SRCALPHA else 'RGB'
+    image = Image.frombytes(mode, surface.get_size(), pygame.image.tobytes(surface, mode))
+    if image.getcolors(256) is not None:
+        image.quantize(256, method=Image.Quantize.FASTOCTREE).save(path, optimize=True)
+        # pygame must load the palette PNG back to the same pixels and alpha
+        if _same_pixels(path, surface):
+            return
+    image.save(path, optimize=True)
+
+
+def optimise_image(source, target, sizes):
+    surface = pygame.image.load(source)
+    if len(sizes) == 1 and None not in sizes:
+        (width, height), = sizes
+        # Only ever scale down; the loader still scales anything smaller up
+        if width <= surface.get_width() and height <= surface.get_height():
+            surface = asset_loader.load_scaled(source, (width, height))
+    if target.lower().endswith('.png'):
+        save_png(surface, target)
+    else:
+        pygame.image.save(surface, target)
+    if os.path.getsize(target) >= os.path.getsize(source):
+        shutil.copy2(source, target)
+
+
+def transcode_audio(source, target, bitrate):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg:
+        result = subprocess.run([ffmpeg, '-v', 'error', '-y', '-i', source, '-c:a', 'libvorbis', '-b:a', bitrate, target])
+        if result.returncode == 0 and os.path.getsize(target) < os.path.getsize(source):
+            return
+    shutil.copy2(source, target)
+
+
+def bundle_size(directory):
+    """Size of a deflated zip of `directory`, which is what a pygbag .apk is."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for folder, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if d not in STAGE_SKIP)
+            for name in sorted(files):
+                path = os.path.join(folder, name)
+                bundle.write(path, os.path.relpath(path, directory))
+    return buffer.tell()
+
+
+def stage(level, root=STAGE_ROOT, bitrate=AUDIO_BITRATE):
+    """Write an optimised copy of a level under `root`."""
+    level_dir = os.path.join(GAME_SRC, level)
+    target_dir = os.path.join(root, level)
+    with open(os.path.join(level_dir, asset_loader.MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    sizes = image_sizes(manifest)
+    left_out = atlas_only(manifest, level_dir)
+
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    for folder, dirs, files in os.walk(level_dir):
+        dirs[:] = [d for d in dirs if d not in STAGE_SKIP]
+        os.makedirs(os.path.join(target_dir, os.path.relpath(folder, level_dir)), exist_ok=True)
+        for name in files:
+            source = os.path.join(folder, name)
+            path = os.path.relpath(source, level_dir).replace(os.sep, '/')
+            target = os.path.join(target_dir, path)
+            if path in left_out:
+                continue
+            if path in sizes:
+                optimise_image(source, target, sizes[path])
+            elif path == asset_loader.ATLAS_IMAGE:
+                optimise_image(source, target, {None})
+            elif name.lower().endswith(AUDIO_SUFFIXES):
+                transcode_audio(source, target, bitrate)
+            else:
+                shutil.copy2(source, target)
+    vendor(target_dir)
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def write_pack(pack_dir, files):
+    """Write {name: source path} as shared-<hash>.apk in pack_dir.
+
+    The zip entries carry a fixed date, so the same files always give the
+    same bytes and the same name. Returns the pack's file name.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for name, source in sorted(files.items()):
+            info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(source, 'rb') as f:
+                bundle.writestr(info, f.read())
+    data = buffer.getvalue()
+    pack = f"shared-{hashlib.sha256(data).hexdigest()[:16]}.apk"
+    os.makedirs(pack_dir, exist_ok=True)
+    with open(os.path.join(pack_dir, pack), 'wb') as f:
+        f.write(data)
+    return pack
+
+
+def prune_packs(pack_dir, keep=None):
+    """Remove the packs (and their precompressed variants) other runs left in pack_dir."""
+    if not os.path.isdir(pack_dir):
+        return
+    for name in os.listdir(pack_dir):
+        if name.startswith('shared-') and (keep is None or name.partition('.apk')[0] + '.apk' != keep):
+            os.remove(os.path.join(pack_dir, name))
+
+
+def share_assets(levels, root=STAGE_ROOT, prune=False):
+    """Move images (and atlases) that several staged levels contain into one shared pack.
+
+    The pack goes to SHARED_PACK_DIR under root. With prune, which is only
+    safe when levels are all the staged levels, other packs there are
+    removed. Returns the pack's file name and, per level, the bytes its
+    bundle no longer contains.
+    """
+    pack_dir = os.path.join(root, SHARED_PACK_DIR)
+    copies = {}  # content hash -> [(level, path), ...]
+    for level in levels:
+        with open(os.path.join(root, level, asset_loader.MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        for path in [*image_sizes(manifest), asset_loader.ATLAS_IMAGE]:
+            staged = os.path.join(root, level, path)
+            if os.path.isfile(staged) and os.path.getsize(staged) >= MIN_SHARED_SIZE:
+                copies.setdefault(file_hash(staged), []).append((level, path))
+    copies = {digest: users for digest, users in copies.items() if len({level for level, _ in users}) > 1}
+    if not copies:
+        if prune:
+            prune_packs(pack_dir)
+        return None, {}
+
+    names = {digest: digest[:16] + os.path.splitext(users[0][1])[1].lower() for digest, users in copies.items()}
+    pack = write_pack(pack_dir, {names[digest]: os.path.join(root, *users[0]) for digest, users in copies.items()})
+    if prune:
+        prune_packs(pack_dir, keep=pack)
+
+    saved = dict.fromkeys(levels, 0)
+    index = {level: {} for level in levels}
+    for digest, users in copies.items():
+        for level, path in users:
+            staged = os.path.join(root, level, path)
+            saved[level] += os.path.getsize(staged)
+            os.remove(staged)
+            index[level][path] = names[digest]
+    for level, files in index.items():
+        if files:
+            with open(os.path.join(root, level, asset_loader.SHARED_INDEX), 'w') as f:
+                json.dump({'url': SHARED_URL + pack, 'mount': SHARED_MOUNT, 'files': dict(sorted(files.items()))}, f, indent=2)
+                f.write('\n')
+    return pack, saved
+
+
+def prepare(level):
+    level_dir = os.path.join(GAME_SRC, level)
+    with open(os.path.join(level_dir, asset_loader.MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    packed = pack_atlas(level_dir, manifest)
+    print(f"{level:22} {packed} sprites in the atlas")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pack texture atlases and stage levels for pygbag packaging.")
+    parser.add_argument('levels', nargs='*', help='levels as <Tier>/<Level> (default: every level with a manifest)')
+    parser.add_argument('--stage', nargs='?', const=STAGE_ROOT, metavar='DIR',
+                        help=f"also write optimised copies of the levels to DIR (default: {os.path.relpath(STAGE_ROOT)})")
+    parser.add_argument('--audio-bitrate', default=AUDIO_BITRATE, help='bitrate for transcoded .ogg audio when staging')
+    args = parser.parse_args()
+
+    bundles = {}  # level -> bundle size before staging
+    for level in args.levels or levels_with_manifest():
+        prepare(level)
+        if args.stage:
+            stage(level, args.stage, args.audio_bitrate)
+            bundles[level] = bundle_size(os.path.join(GAME_SRC, level))
+
+    if bundles:
+        every_level = set(bundles) >= set(levels_with_manifest())
+        pack, saved = share_assets(list(bundles), args.stage, prune=every_level)
+        print()
+        if not every_level:
+            print("Only some levels were staged: packs from earlier runs are kept, as other staged levels may use them.")
+        for level, before in bundles.items():
+            after = bundle_size(os.path.join(args.stage, level))
+            print(f"{level:22} bundle {before / 1e6:6.2f} MB -> {after / 1e6:6.2f} MB ({(after - before) / before:+.0%}),"
+                  f" {saved.get(level, 0) / 1e3:5.0f} KB moved to the shared pack")
+        before = sum(bundles.values())
+        after = sum(bundle_size(os.path.join(args.stage, level)) for level in bundles)
+        if pack:
+            pack_path = os.path.join(args.stage, SHARED_PACK_DIR, pack)
+            after += os.path.getsize(pack_path)
+            print(f"shared pack {os.path.relpath(pack_path)}: {os.path.getsize(pack_path) / 1e6:.2f} MB for "
+                  f"{sum(saved.values()) / 1e6:.2f} MB of copies")
+        print(f"{'total':22} {before / 1e6:6.2f} MB -> {after / 1e6:6.2f} MB ({(after - before) / before:+.0%})")
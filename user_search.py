@@ -0,0 +1,137 @@
+"""In-process prefix index of usernames for the friend search.
+
+`search_user` used to run `username LIKE '%q%'`, a full scan of users on
+every search. Instead each worker keeps every username in one sorted list,
+so a prefix search is a binary search plus a short walk. New signups are
+pulled in incrementally (`id > last seen id`) at most every refresh_interval
+seconds, and the whole list is reloaded every full_reload_interval seconds
+to drop deleted accounts.
+
+Searches read the list without the lock, so it is never changed in place:
+updates build a new list under the lock and swap it in. The full reload reads
+every username, so it runs in a background thread while searches keep using
+the old list; warm() starts the first load the same way, ahead of the first
+search.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+log = logging.getLogger(__name__)
+
+
+class UsernameIndex:
+    def __init__(self, load, refresh_interval=5, full_reload_interval=600):
+        # load(after_id) -> iterable of (id, username) rows with id > after_id
+        self.load = load
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.entries = None  # sorted [(casefolded username, username), ...]
+        self.max_id = 0
+        self._checked_at = self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._warming = self._reloading = False
+
+    def _load_all(self):
+        entries, max_id = [], 0
+        for user_id, username in self.load(0):
+            entries.append((username.casefold(), username))
+            max_id = max(max_id, user_id)
+        entries.sort()
+        return entries, max_id
+
+    def _load_first(self):
+        with self._lock:
+            if self.entries is None:
+                self.entries, self.max_id = self._load_all()
+                self._loaded_at = self._checked_at = time.monotonic()
+
+    def _reload(self):
+        try:
+            # Outside the lock, so searches, pulls and add() carry on meanwhile
+            entries, max_id = self._load_all()
+            with self._lock:
+                self.entries, self.max_id = entries, max_id
+                self._loaded_at = time.monotonic()
+                # Signups committed while the reload was reading
+                self._pull_new()
+        except Exception:
+            log.exception("could not reload the username index, keeping the old one")
+        finally:
+            self._reloading = False
+
+    def _warm(self):
+        try:
+            self._load_first()
+        except Exception:
+            log.exception("could not load the username index ahead of the first search")
+
+    def warm(self):
+        """Start loading the index in a background thread, if nothing has loaded it yet."""
+        if self.entries is None and not self._warming:
+            self._warming = True
+            threading.Thread(target=self._warm, daemon=True).start()
+
+    def _pull_new(self):
+        entries, max_id = list(self.entries), self.max_id
+        for user_id, username in self.load(self.max_id):
+            self._insert(entries, username)
+            max_id = max(max_id, user_id)
+        self.entries, self.max_id = entries, max_id
+        self._checked_at = time.monotonic()
+
+    @staticmethod
+    def _insert(entries, username):
+        entry = (username.casefold(), username)
+        i = bisect_left(entries, entry)
+        if i == len(entries) or entries[i] != entry:
+            entries.insert(i, entry)
+
+    def refresh(self):
+        if self.entries is None:
+            # Nothing to search yet; waits for warm() if it is already loading
+            self._load_first()
+            return
+        now = time.monotonic()
+        if now - self._loaded_at >= self.full_reload_interval:
+            with self._lock:
+                start, self._reloading = not self._reloading, True
+            if start:
+                threading.Thread(target=self._reload, daemon=True).start()
+        if now - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.refresh_interval:
+                    self._pull_new()
+
+    def add(self, username):
+        """Make a new signup searchable in this worker straight away."""
+        with self._lock:
+            if self.entries is not None:
+                entries = list(self.entries)
+                self._insert(entries, username)
+                self.entries = entries
+
+    def search(self, prefix, exclude=(), after=None, limit=20):
+        """Usernames starting with `prefix` (case-insensitive), skipping `exclude`.
+
+        Pages are keyset-paginated: pass the last username of a page as `after`
+        to get the next one. Returns (usernames, next_after or None).
+        """
+        self.refresh()
+        entries = self.entries
+        key = prefix.casefold()
+        i = bisect_left(entries, (key,))
+        if after:
+            i = max(i, bisect_right(entries, (after.casefold(), after)))
+
+        results = []
+        while i < len(entries) and entries[i][0].startswith(key):
+            username = entries[i][1]
+            i += 1
+            if username in exclude:
+                continue
+            if len(results) == limit:
+                return results, results[-1]
+            results.append(username)
+        return results, None